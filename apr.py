@@ -1,10 +1,20 @@
+import numpy as np
 import pandas as pd
 
+# Polars writes CSV from the column buffers natively; fall back to pandas without it
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
 
 def calculate_apr_from_monthly(P, A, n, tol=1e-8, max_iter=1000):
     """
     Calculate Annual Percentage Rate (APR) using monthly payment formula.
 
+    Solves P*r*(1+r)^n / ((1+r)^n - 1) = A with Newton-Raphson, keeping a
+    bisection bracket so any step that leaves it falls back to the midpoint.
+
     :param P: Loan principal
     :param A: Monthly payment
     :param n: Number of monthly payments
@@ -17,22 +27,35 @@ def calculate_apr_from_monthly(P, A, n, tol=1e-8, max_iter=1000):
         return 0.0, 0.0
 
     low, high = 0.0, 1.0  # search between 0% and 100% monthly interest
-    r = 0.0
+    r = (A * n / P - 1) * 2 / (n + 1)  # simple-interest starting guess
+    if not low < r < high:
+        r = (low + high) / 2
 
     for _ in range(max_iter):
-        r = (low + high) / 2
-        denom = ((1 + r) ** n - 1)
+        un1 = (1 + r) ** (n - 1)
+        u = (1 + r) * un1
+        denom = u - 1
         if denom == 0:
             denom = 1e-12
-        estimated_payment = P * r * (1 + r) ** n / denom
+        estimated_payment = P * r * u / denom
 
-        if abs(estimated_payment - A) < tol:
+        diff = estimated_payment - A
+        if abs(diff) < tol:
             break
-        if estimated_payment > A:
+        if diff > 0:
             high = r
         else:
             low = r
 
+        # d/dr of P*r*u/(u-1), reusing (1+r)**(n-1)
+        slope = P * (u * denom - r * n * un1) / (denom * denom)
+        if abs(slope) < 1e-14:
+            r = (low + high) / 2
+            continue
+        r -= diff / slope
+        if not low < r < high:
+            r = (low + high) / 2
+
     apr = r * 12 * 100
     return r, apr
 
@@ -45,24 +68,34 @@ def generate_amortization_schedule(P, A, r, n):
     :param A: Monthly payment
     :param r: Monthly interest rate
     :param n: Number of payments
-    :return: List of dictionaries with payment details
+    :return: Dict mapping column name to a NumPy array of payment details
     """
-    schedule = []
-    balance = P
-
-    for month in range(1, n + 1):
-        interest = balance * r
-        principal = A - interest
-        balance -= principal
-        balance = max(balance, 0)
-        schedule.append({
-            "Month": month,
-            "Payment": round(A, 2),
-            "Interest": round(interest, 2),
-            "Principal": round(principal, 2),
-            "Remaining Balance": round(balance, 2)
-        })
-    return schedule
+    month = np.arange(1, n + 1)
+
+    # Closed-form balance after each payment: B_k = P(1+r)^k - A((1+r)^k - 1)/r.
+    # Equivalent to numpy_financial ipmt/ppmt, but driven by the entered payment A
+    # rather than the pmt implied by (r, n, P), so clamped rates stay consistent.
+    if r == 0:
+        balance = P - A * month.astype(float)
+    else:
+        # expm1/log1p keep (1+r)^k - 1 accurate when the solver returns a near-zero r
+        growth_m1 = np.expm1(month * np.log1p(r))
+        balance = P * (growth_m1 + 1) - A * growth_m1 / r
+    np.clip(balance, 0, None, out=balance)
+
+    # Interest accrues on the balance left after the previous payment
+    interest = np.empty(n)
+    interest[:1] = P * r
+    interest[1:] = balance[:-1] * r
+    principal = A - interest
+
+    return {
+        "Month": month,
+        "Payment": np.full(n, round(A, 2)),
+        "Interest": np.round(interest, 2),
+        "Principal": np.round(principal, 2),
+        "Remaining Balance": np.round(balance, 2)
+    }
 
 
 def display_schedule(schedule):
@@ -70,23 +103,26 @@ def display_schedule(schedule):
     print("-" * 70)
     print(f"{'Month':<6}{'Payment':>12}{'Interest':>12}{'Principal':>12}{'Balance':>15}")
     print("-" * 70)
-    for row in schedule:
-        print(f"{row['Month']:<6}{row['Payment']:>12.2f}{row['Interest']:>12.2f}{row['Principal']:>12.2f}{row['Remaining Balance']:>15.2f}")
+    for month, payment, interest, principal, balance in zip(*(col.tolist() for col in schedule.values())):
+        print(f"{month:<6}{payment:>12.2f}{interest:>12.2f}{principal:>12.2f}{balance:>15.2f}")
 
 
 def export_schedule(schedule, filename_base="loan_schedule"):
     """
     Export amortization schedule to Excel and CSV.
 
-    :param schedule: List of dicts
+    :param schedule: Dict of column arrays
     :param filename_base: Base filename (without extension)
     """
-    df = pd.DataFrame(schedule)
+    df = pd.DataFrame(schedule, copy=False)
     excel_file = f"{filename_base}.xlsx"
     csv_file = f"{filename_base}.csv"
 
     df.to_excel(excel_file, index=False, engine="openpyxl")
-    df.to_csv(csv_file, index=False)
+    if pl is not None:
+        pl.DataFrame(schedule).write_csv(csv_file)
+    else:
+        df.to_csv(csv_file, index=False)
 
     print(f"\n✅ Schedule exported to:\n  - {excel_file}\n  - {csv_file}")
 
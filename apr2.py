@@ -1,60 +1,116 @@
+import csv
 import sys
 import os
+import math
+import numpy as np
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, numbers
-
-
-def calculate_apr_from_monthly(P, A, n, tol=1e-10, max_iter=10000):
-    """
-    Calculate APR using binary search, with improved stability.
-    Returns (monthly_rate, annual_percentage_rate)
-    """
-    if A * n <= P:
-        print("\n⚠️ Invalid loan terms: monthly payments too low to repay principal.")
-        return 0.0, 0.0
-
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle, numbers
+from openpyxl.utils import get_column_letter
+
+# Numba compiles the APR solver to native code; without it the solver runs as plain Python
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# Polars writes CSV from the column buffers natively; fall back to pandas without it
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# PyExcelerate writes whole row blocks in one pass; fall back to openpyxl without it
+try:
+    import pyexcelerate as pxl
+    from pyexcelerate.Borders import Borders as PxlBorders
+    from pyexcelerate.Border import Border as PxlBorder
+except ImportError:
+    pxl = None
+
+
+@njit(cache=True)
+def solve_monthly_rate(P, A, n, tol, max_iter):
+    """Newton-Raphson for the monthly rate, bisecting whenever a step leaves the bracket."""
     low, high = 0.0, 2.0  # up to 200% monthly
-    r = 0.0
+    r = (A * n / P - 1) * 2 / (n + 1)  # simple-interest starting guess
+    if not low < r < high:
+        r = (low + high) / 2
 
     for _ in range(max_iter):
-        r = (low + high) / 2
-        denom = ((1 + r) ** n - 1)
+        # One pow per iteration; unrolled multiply chains for fixed n were no faster here
+        un1 = (1 + r) ** (n - 1)
+        u = (1 + r) * un1
+        denom = u - 1
         if denom == 0:
             denom = 1e-12
-        estimated_payment = P * r * (1 + r) ** n / denom
+        estimated_payment = P * r * u / denom
 
         diff = estimated_payment - A
 
-        if abs(diff) < tol:
+        if math.fabs(diff) < tol:
             break
         if diff > 0:
             high = r
         else:
             low = r
 
+        # Newton step on d/dr of P*r*u/(u-1); bisect if it leaves the bracket
+        slope = P * (u * denom - r * n * un1) / (denom * denom)
+        if math.fabs(slope) < 1e-14:
+            r = (low + high) / 2
+            continue
+        r -= diff / slope
+        if not low < r < high:
+            r = (low + high) / 2
+
+    return r
+
+
+def calculate_apr_from_monthly(P, A, n, tol=1e-10, max_iter=10000):
+    """
+    Calculate APR using Newton-Raphson, with a bisection fallback for stability.
+    Returns (monthly_rate, annual_percentage_rate)
+    """
+    if A * n <= P:
+        print("\n⚠️ Invalid loan terms: monthly payments too low to repay principal.")
+        return 0.0, 0.0
+
+    r = solve_monthly_rate(P, A, n, tol, max_iter)
     apr = r * 12 * 100
     return r, apr
 
 
 def generate_amortization_schedule(P, A, r, n):
-    """Generate amortization schedule."""
-    schedule = []
-    balance = P
-
-    for month in range(1, n + 1):
-        interest = balance * r
-        principal = A - interest
-        balance -= principal
-        balance = max(balance, 0)
-        schedule.append({
-            "Month": month,
-            "Payment": round(A, 2),
-            "Interest": round(interest, 2),
-            "Principal": round(principal, 2),
-            "Remaining Balance": round(balance, 2)
-        })
-    return schedule
+    """Generate amortization schedule as a dict of NumPy column arrays."""
+    month = np.arange(1, n + 1)
+
+    # Closed-form balance after each payment: B_k = P(1+r)^k - A((1+r)^k - 1)/r.
+    # Equivalent to numpy_financial ipmt/ppmt, but driven by the entered payment A
+    # rather than the pmt implied by (r, n, P), so clamped rates stay consistent.
+    if r == 0:
+        balance = P - A * month.astype(float)
+    else:
+        # expm1/log1p keep (1+r)^k - 1 accurate when the solver returns a near-zero r
+        growth_m1 = np.expm1(month * np.log1p(r))
+        balance = P * (growth_m1 + 1) - A * growth_m1 / r
+    np.clip(balance, 0, None, out=balance)
+
+    # Interest accrues on the balance left after the previous payment
+    interest = np.empty(n)
+    interest[:1] = P * r
+    interest[1:] = balance[:-1] * r
+    principal = A - interest
+
+    return {
+        "Month": month,
+        "Payment": np.full(n, round(A, 2)),
+        "Interest": np.round(interest, 2),
+        "Principal": np.round(principal, 2),
+        "Remaining Balance": np.round(balance, 2)
+    }
 
 
 def display_schedule(schedule):
@@ -63,19 +119,18 @@ def display_schedule(schedule):
     print("-" * 70)
     print(f"{'Month':<6}{'Payment':>12}{'Interest':>12}{'Principal':>12}{'Balance':>15}")
     print("-" * 70)
-    for row in schedule:
-        print(f"{row['Month']:<6}{row['Payment']:>12.2f}{row['Interest']:>12.2f}"
-              f"{row['Principal']:>12.2f}{row['Remaining Balance']:>15.2f}")
+    rows = zip(*(col.tolist() for col in schedule.values()))
+    for month, payment, interest, principal, balance in rows:
+        print(f"{month:<6}{payment:>12.2f}{interest:>12.2f}"
+              f"{principal:>12.2f}{balance:>15.2f}")
 
 
 def export_schedule(schedule, P, A, n, apr, output_folder="."):
     """Export schedule and summary to Excel and CSV, with optional output folder."""
-    df = pd.DataFrame(schedule)
-
     # --- Totals ---
-    total_payment = df["Payment"].sum()
-    total_interest = df["Interest"].sum()
-    total_principal = df["Principal"].sum()
+    total_payment = schedule["Payment"].sum()
+    total_interest = schedule["Interest"].sum()
+    total_principal = schedule["Principal"].sum()
 
     totals_row = {
         "Month": "TOTAL",
@@ -84,7 +139,9 @@ def export_schedule(schedule, P, A, n, apr, output_folder="."):
         "Principal": round(total_principal, 2),
         "Remaining Balance": ""
     }
-    df.loc[len(df)] = totals_row
+    # Append the totals row to the column arrays once, then build the frame
+    df = pd.DataFrame({name: np.append(col.astype(object), totals_row[name])
+                       for name, col in schedule.items()}, copy=False)
 
     # --- Loan summary with totals ---
     total_cost = total_payment
@@ -109,62 +166,150 @@ def export_schedule(schedule, P, A, n, apr, output_folder="."):
     excel_file = os.path.join(output_folder, f"{filename_base}.xlsx")
 
     # --- Save CSV ---
-    df.to_csv(csv_file, index=False)
+    if pl is not None:
+        save_csv_polars(csv_file, schedule, totals_row)
+    else:
+        df.to_csv(csv_file, index=False)
 
     # --- Save Excel ---
-    with pd.ExcelWriter(excel_file, engine="openpyxl") as writer:
-        summary_df = pd.DataFrame(summary_data)
-        summary_df.to_excel(writer, sheet_name="Amortization Schedule", index=False, startrow=0)
-        df.to_excel(writer, sheet_name="Amortization Schedule", index=False, startrow=9)
+    if pxl is not None:
+        save_excel_pyexcelerate(excel_file, summary_data, df)
+    else:
+        save_excel_openpyxl(excel_file, summary_data, df)
+
+    print(f"\n✅ Schedule exported successfully:")
+    print(f"  - {excel_file}")
+    print(f"  - {csv_file}")
+
+
+def save_csv_polars(csv_file, schedule, totals_row):
+    """Write the numeric schedule columns with Polars, then append the mixed-type totals row."""
+    pl.DataFrame(schedule).write_csv(csv_file)
+    with open(csv_file, "a", newline="") as f:
+        csv.writer(f, lineterminator="\n").writerow(totals_row.values())
+
+
+def excel_rows(summary_data, df, header_row=10):
+    """Lay out the summary block and the schedule table (header at header_row) as sheet rows."""
+    rows = [list(summary_data)]
+    rows += [list(r) for r in zip(*summary_data.values())]
+    rows += [[] for _ in range(header_row - 1 - len(rows))]
+    rows.append(list(df.columns))
+    rows += df.astype(object).values.tolist()
+    return rows
+
+
+def column_widths(rows, num_cols):
+    """Auto column widths: longest non-empty value in each column plus padding."""
+    return [max(len(str(r[col])) for r in rows if len(r) > col and r[col]) + 3
+            for col in range(num_cols)]
+
+
+def save_excel_pyexcelerate(excel_file, summary_data, df):
+    """Write summary and schedule as one bulk PyExcelerate sheet with shared styles."""
+    header = 10
+    rows = excel_rows(summary_data, df, header)
+
+    wb = pxl.Workbook()
+    ws = wb.new_sheet("Amortization Schedule", data=rows)
+
+    # Build each style once and share it across rows/columns
+    currency = pxl.Format("$#,##0.00_-")  # FORMAT_CURRENCY_USD_SIMPLE; pyexcelerate doesn't escape quotes
+    bold_font = pxl.Font(bold=True)
+    center_align = pxl.Alignment(horizontal="center")
+    total_font = pxl.Font(bold=True, color=pxl.Color(0x1F, 0x49, 0x7D))
+    total_fill = pxl.Fill(background=pxl.Color(0xD9, 0xE1, 0xF2))
+    header_style = pxl.Style(
+        font=bold_font,
+        fill=pxl.Fill(background=pxl.Color(0xF2, 0xF2, 0xF2)),
+        borders=PxlBorders(bottom=PxlBorder(style="thin")),
+        alignment=center_align,
+    )
+    total_style = pxl.Style(font=total_font, fill=total_fill)
+    total_currency_style = pxl.Style(font=total_font, fill=total_fill, format=currency)
+    bold_style = pxl.Style(font=bold_font)
+
+    # Auto column widths; numeric columns carry the currency format
+    for col, width in enumerate(column_widths(rows, len(df.columns)), 1):
+        if col == 1:
+            ws.set_col_style(col, pxl.Style(size=width))
+        else:
+            ws.set_col_style(col, pxl.Style(size=width, format=currency))
+
+    # Format summary section
+    ws.set_row_style(1, pxl.Style(font=bold_font, alignment=center_align))
+    for row in range(2, 7):
+        ws.set_cell_style(row, 1, bold_style)
+    ws.set_cell_style(4, 2, pxl.Style(format=currency, alignment=center_align))  # APR
 
-    # --- Format Excel ---
-    wb = load_workbook(excel_file)
-    ws = wb["Amortization Schedule"]
+    # Header formatting
+    ws.set_row_style(header, header_style)
+
+    # Highlight totals row
+    total_row = len(rows)
+    ws.set_row_style(total_row, total_style)
+    for col in range(2, len(df.columns) + 1):
+        ws.set_cell_style(total_row, col, total_currency_style)
+
+    wb.save(excel_file)
+
+
+def save_excel_openpyxl(excel_file, summary_data, df):
+    """Stream summary and schedule rows through an openpyxl write-only workbook."""
+    header_row = 10
+    rows = excel_rows(summary_data, df, header_row)
 
     bold_font = Font(bold=True)
     center_align = Alignment(horizontal="center")
     border = Border(bottom=Side(style="thin"))
     header_fill = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
-
-    # Format summary section
-    for cell in ws["A"][0:6]:
-        cell.font = bold_font
-    for cell in ws["B"][0:6]:
-        if isinstance(cell.value, (int, float)):
-            cell.number_format = numbers.FORMAT_CURRENCY_USD_SIMPLE
-    ws["B4"].alignment = center_align  # APR
+    total_font = Font(bold=True, color="1F497D")
+    total_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
+
+    wb = Workbook(write_only=True)
+    wb.add_named_style(NamedStyle(name="currency", number_format=numbers.FORMAT_CURRENCY_USD_SIMPLE))
+    ws = wb.create_sheet("Amortization Schedule")
+
+    # Auto column widths (must be set before any row is written)
+    for col, width in enumerate(column_widths(rows, len(df.columns)), 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+
+    def cell(value, style=None, **attrs):
+        c = WriteOnlyCell(ws, value=value)
+        if style:
+            c.style = style
+        for name, attr in attrs.items():
+            setattr(c, name, attr)
+        return c
+
+    # Summary block: bold labels, currency for numeric values
+    summary_rows = rows[:header_row - 1]
+    ws.append([cell(v, font=bold_font, alignment=center_align, border=border) for v in summary_rows[0]])
+    for row_num, row in enumerate(summary_rows[1:], 2):
+        if not row:
+            ws.append([])
+            continue
+        label, value = row
+        value_cell = cell(value, "currency" if isinstance(value, (int, float, np.number)) else None)
+        if row_num == 4:
+            value_cell.alignment = center_align  # APR
+        ws.append([cell(label, font=bold_font) if row_num <= 6 else label, value_cell])
 
     # Header formatting
-    header_row = 10
-    for cell in ws[header_row]:
-        cell.font = bold_font
-        cell.fill = header_fill
-        cell.border = border
-        cell.alignment = center_align
-
-    # Format numeric columns
-    for row in ws.iter_rows(min_row=header_row + 1, min_col=2, max_col=5):
-        for cell in row:
-            if isinstance(cell.value, (int, float)):
-                cell.number_format = numbers.FORMAT_CURRENCY_USD_SIMPLE
+    ws.append([cell(v, font=bold_font, fill=header_fill, border=border, alignment=center_align)
+               for v in rows[header_row - 1]])
 
-    # Highlight totals row
-    total_row = ws.max_row
-    for cell in ws[total_row]:
-        cell.font = Font(bold=True, color="1F497D")
-        cell.fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
+    # Schedule rows: the numeric columns are known, so no per-cell type checks
+    for month, *amounts in rows[header_row:-1]:
+        ws.append([month] + [cell(v, "currency") for v in amounts])
 
-    # Auto column widths
-    for col in ws.columns:
-        max_length = max(len(str(cell.value)) for cell in col if cell.value)
-        ws.column_dimensions[col[0].column_letter].width = max_length + 3
+    # Highlight totals row
+    label, *totals = rows[-1]
+    ws.append([cell(label, font=total_font, fill=total_fill)]
+              + [cell(v, "currency", font=total_font, fill=total_fill) for v in totals])
 
     wb.save(excel_file)
 
-    print(f"\n✅ Schedule exported successfully:")
-    print(f"  - {excel_file}")
-    print(f"  - {csv_file}")
-
 
 # ---------------- MAIN PROGRAM ----------------
 if __name__ == "__main__":
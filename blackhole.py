@@ -1,6 +1,7 @@
 import pygame
 import numpy as np
 import math
+from functools import lru_cache
 
 # === Config ===
 WIDTH, HEIGHT = 1000, 700
@@ -17,72 +18,85 @@ pygame.display.set_caption("3D Black Hole Simulation with Gravitational Lensing"
 clock = pygame.time.Clock()
 
 # === 3D Utilities ===
-def rotate_y(points, angle):
-    c, s = np.cos(angle), np.sin(angle)
-    R = np.array([[c, 0, s],
-                  [0, 1, 0],
-                  [-s, 0, c]])
-    return points @ R.T
-
-def rotate_x(points, angle):
-    c, s = np.cos(angle), np.sin(angle)
-    R = np.array([[1, 0, 0],
-                  [0, c, -s],
-                  [0, s, c]])
-    return points @ R.T
-
-def apply_lensing(points, strength=800, radius=200):
-    """Apply gravitational lensing near the black hole center."""
-    for i in range(len(points)):
-        x, y, z = points[i]
-        r = math.sqrt(x**2 + y**2 + z**2) + 1e-6
-        if r < radius * 3:
-            bend = strength / (r**2 + 100)
-            scale = 1 + bend * 0.0005
-            points[i, 0] *= scale
-            points[i, 1] *= scale
-            points[i, 2] *= scale
-    return points
-
-def project(points3d):
-    projected = []
-    for x, y, z in points3d:
-        if z <= -FOCAL_LENGTH + 1:
-            z = -FOCAL_LENGTH + 1
-        f = FOCAL_LENGTH / (FOCAL_LENGTH + z)
-        px = WIDTH / 2 + x * f
-        py = HEIGHT / 2 - y * f
-        projected.append((px, py))
-    return projected
+def rotation_matrix(yaw, pitch, out):
+    """Fill out with Rx(pitch) @ Ry(yaw), i.e. a yaw rotation followed by pitch."""
+    cy, sy = math.cos(yaw), math.sin(yaw)
+    cp, sp = math.cos(pitch), math.sin(pitch)
+    out[0, 0], out[0, 1], out[0, 2] = cy, 0.0, sy
+    out[1, 0], out[1, 1], out[1, 2] = sp * sy, cp, -sp * cy
+    out[2, 0], out[2, 1], out[2, 2] = -cp * sy, sp, cp * cy
+    return out
+
+def rotate(points, R, out):
+    """Rotate row-vector points by R into the preallocated out buffer."""
+    return np.dot(points, R.T, out=out)
+
+def apply_lensing(points, strength=800, radius=200, out=None):
+    """Apply gravitational lensing near the black hole center (writes into out, default in place)."""
+    r2 = np.einsum("ij,ij->i", points, points)
+    near = r2 < (radius * 3) ** 2  # squared test, so far points never need a sqrt
+    if out is None:
+        out = points
+    elif out is not points:
+        out[...] = points
+    r = np.sqrt(r2[near]) + 1e-6
+    out[near] = points[near] * (1 + strength * 0.0005 / (r * r + 100))[:, None]
+    return out
+
+def project(points3d, out):
+    """Perspective-project (N,3) points into the preallocated (N,2) screen buffer."""
+    z = np.maximum(points3d[:, 2], -FOCAL_LENGTH + 1)
+    f = FOCAL_LENGTH / (FOCAL_LENGTH + z)
+    out[:, 0] = WIDTH / 2 + points3d[:, 0] * f
+    out[:, 1] = HEIGHT / 2 - points3d[:, 1] * f
+    return out
 
 # === Generate spacetime grid ===
-grid_points = []
 size = 300
 step = 40
-for x in np.arange(-size, size + step, step):
-    line = []
-    for y in np.arange(-size, size + step, step):
-        r = math.sqrt(x**2 + y**2) + 1e-5
-        z = -200 / (r + 50)
-        line.append([x, y, z])
-    grid_points.append(np.array(line))
+coords = np.arange(-size, size + step, step)
+xs, ys = np.meshgrid(coords, coords, indexing="ij")  # one grid line per x
+zs = -200 / (np.hypot(xs, ys) + 1e-5 + 50)
+grid_points = np.stack([xs, ys, zs], axis=-1)
+
+# The grid is static in world space, so lens it once and keep it as one flat (M,3) array.
+# Every other line runs backwards, so the lines chain end to end into one polyline for a single draw call
+# (the joins run along the grid's outer edge).
+grid_points[1::2] = grid_points[1::2, ::-1]
+grid_flat = apply_lensing(grid_points.reshape(-1, 3))
 
 # === Accretion ring ===
 theta = np.linspace(0, 2*np.pi, 300)
 ring_radius = 180
-ring = np.array([[ring_radius * np.cos(t),
-                  40 * np.sin(2*t),
-                  ring_radius * np.sin(t)] for t in theta])
+ring = np.column_stack([ring_radius * np.cos(theta),
+                        40 * np.sin(2*theta),
+                        ring_radius * np.sin(theta)])
 
 # === Event horizon glow ===
-def draw_glow(surface, x, y, radius, color, layers=6, alpha_decay=25):
+@lru_cache(maxsize=None)
+def glow_layers(radius, color, layers=6, alpha_decay=25):
+    """Render the glow rings once; returns [(glow_radius, surface), ...]."""
+    rendered = []
     for i in range(layers):
         glow_radius = int(radius * (1 + i * 0.4))
         alpha = max(0, 180 - i * alpha_decay)
         glow = pygame.Surface((glow_radius * 2, glow_radius * 2), pygame.SRCALPHA)
         pygame.draw.circle(glow, (*color, alpha), (glow_radius, glow_radius), glow_radius)
+        rendered.append((glow_radius, glow))
+    return rendered
+
+def draw_glow(surface, x, y, radius, color, layers=6, alpha_decay=25):
+    for glow_radius, glow in glow_layers(radius, color, layers, alpha_decay):
         surface.blit(glow, (x - glow_radius, y - glow_radius), special_flags=pygame.BLEND_PREMULTIPLIED)
 
+# === Per-frame buffers ===
+cam_R = np.empty((3, 3))
+ring_R = np.empty((3, 3))
+grid_rot = np.empty_like(grid_flat)
+grid_2d = np.empty((len(grid_flat), 2))
+ring_rot = np.empty_like(ring)
+ring_2d = np.empty((len(ring), 2))
+
 # === Camera ===
 yaw, pitch = 0, 0.6
 mouse_sensitivity = 0.005
@@ -110,19 +124,17 @@ while running:
     screen.fill(SPACE_COLOR)
 
     # === Draw warped grid with lensing ===
-    for line in grid_points:
-        warped = apply_lensing(line.copy())
-        rotated = rotate_y(warped, yaw)
-        rotated = rotate_x(rotated, pitch)
-        pts2d = project(rotated)
-        pygame.draw.aalines(screen, GRID_COLOR, False, pts2d, 1)
+    rotation_matrix(yaw, pitch, cam_R)
+    rotate(grid_flat, cam_R, grid_rot)
+    project(grid_rot, grid_2d)
+    pygame.draw.aalines(screen, GRID_COLOR, False, grid_2d, 1)
 
     # === Draw accretion ring ===
-    ring_rot = rotate_y(ring.copy(), yaw + t * 0.5)
-    ring_rot = rotate_x(ring_rot, pitch)
-    ring_lensed = apply_lensing(ring_rot.copy(), strength=1000, radius=220)
-    ring_pts = project(ring_lensed)
-    pygame.draw.aalines(screen, RING_COLOR, True, ring_pts, 2)
+    rotation_matrix(yaw + t * 0.5, pitch, ring_R)
+    rotate(ring, ring_R, ring_rot)
+    apply_lensing(ring_rot, strength=1000, radius=220)
+    project(ring_rot, ring_2d)
+    pygame.draw.aalines(screen, RING_COLOR, True, ring_2d, 2)
 
     # === Draw event horizon ===
     cx, cy = WIDTH // 2, HEIGHT // 2
@@ -0,0 +1,18 @@
+# Ahead-of-time builds orderbook_full's matching kernel into the orderbook_kernels extension module,
+# so the simulator starts without waiting on Numba's JIT. Run once with: python build_kernels.py
+# numba.pycc is deprecated upstream; once it is gone, orderbook_full simply falls back to the JIT kernel.
+import sys
+
+try:
+    from numba.pycc import CC
+except ImportError:
+    sys.exit("build_kernels.py needs numba with numba.pycc (deprecated, removed in newer releases); "
+             "without it orderbook_full uses the JIT-compiled match_levels instead.")
+
+import orderbook_match
+
+cc = CC("orderbook_kernels")
+cc.export("match_levels", "UniTuple(i8, 2)(i8[:], i8[:], i8[:], i8, i8)")(orderbook_match.match_levels.py_func)
+
+if __name__ == "__main__":
+    cc.compile()
@@ -0,0 +1,18 @@
+"""
+Pixel offsets of pygame's filled circles, for stamping many same-sized dots straight into a pixel array.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pygame
+
+
+@lru_cache(maxsize=None)
+def circle_offsets(radius):
+    """(dx, dy) of every pixel pygame.draw.circle fills around its center at this radius"""
+    size = 4 * radius + 1
+    stamp = pygame.Surface((size, size))
+    pygame.draw.circle(stamp, (255, 255, 255), (2 * radius, 2 * radius), radius)
+    xs, ys = np.nonzero(pygame.surfarray.array2d(stamp))
+    return list(zip((xs - 2 * radius).tolist(), (ys - 2 * radius).tolist()))
@@ -31,30 +31,33 @@ edges = [
     (5, 9), (6, 9), (7, 9), (8, 9)
 ]
 
-# --- Rotation function ---
-def rotate(points, ax, ay):
-    Rx = np.array([
+# --- Rotation matrices ---
+def rotation_x(a):
+    return np.array([
         [1, 0, 0],
-        [0, math.cos(ax), -math.sin(ax)],
-        [0, math.sin(ax), math.cos(ax)]
+        [0, math.cos(a), -math.sin(a)],
+        [0, math.sin(a), math.cos(a)]
     ])
-    Ry = np.array([
-        [math.cos(ay), 0, math.sin(ay)],
+
+def rotation_y(a):
+    return np.array([
+        [math.cos(a), 0, math.sin(a)],
         [0, 1, 0],
-        [-math.sin(ay), 0, math.cos(ay)]
+        [-math.sin(a), 0, math.cos(a)]
     ])
-    return points @ Rx.T @ Ry.T
+
+# Per-frame spin (1 deg about x, then 0.8 deg about y) folded into one matrix
+delta = rotation_y(math.radians(0.8)) @ rotation_x(math.radians(1))
 
 # --- Projection function ---
 def project(points, scale=300, distance=3):
-    projected = []
-    for x, y, z in points:
-        factor = scale / (z + distance)
-        projected.append((WIDTH // 2 + int(x * factor), HEIGHT // 2 - int(y * factor)))
-    return projected
+    factor = scale / (points[:, 2] + distance)
+    xs = WIDTH // 2 + (points[:, 0] * factor).astype(np.int32)
+    ys = HEIGHT // 2 - (points[:, 1] * factor).astype(np.int32)
+    return np.column_stack((xs, ys)).tolist()
 
 # --- Main loop ---
-angle_x, angle_y = 0, 0
+orient = np.eye(3)
 running = True
 frame_count = 0
 
@@ -66,7 +69,7 @@ while running:
             running = False
 
     # Rotate shape
-    rotated = rotate(vertices, math.radians(angle_x), math.radians(angle_y))
+    rotated = vertices @ orient.T
     projected = project(rotated)
 
     # Progressive tracing effect
@@ -76,10 +79,12 @@ while running:
         if i < edges_to_show:
             pygame.draw.aaline(screen, (0, 255, 255), projected[p1_idx], projected[p2_idx])
 
-    # Update angles for spinning
-    angle_x += 1
-    angle_y += 0.8
+    # Accumulate the spin; re-orthonormalize now and then to stop drift
+    orient = delta @ orient
     frame_count += 1
+    if frame_count % 1000 == 0:
+        u, _, vt = np.linalg.svd(orient)
+        orient = u @ vt
 
     pygame.display.flip()
     clock.tick(60)  # limit to 60 FPS
@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 import requests
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+
+MAX_WORKERS = 16
 
 def load_repos(filename):
     """Load repo list from a text file"""
@@ -12,11 +17,18 @@ def load_repos(filename):
     with open(path, "r", encoding="utf-8") as f:
         return [line.strip() for line in f if line.strip() and not line.startswith("#")]
 
-def get_latest_release(repo):
+def make_session():
+    """Create one keep-alive session whose pool can serve every worker thread"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+    session.mount("https://", adapter)
+    return session
+
+def get_latest_release(repo, session=requests):
     """Fetch the latest release version from GitHub API"""
     url = f"https://api.github.com/repos/{repo}/releases/latest"
     try:
-        response = requests.get(url, timeout=10)
+        response = session.get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
         return data.get("tag_name", "No tag")
@@ -29,9 +41,12 @@ def main():
     repos = load_repos(filename)
 
     print(f"Latest GitHub release versions (from {filename}):\n")
-    for repo in repos:
-        version = get_latest_release(repo)
-        print(f"{repo:<35}  {version}")
+    # Requests are I/O bound, so poll all repos concurrently; map() keeps file order
+    with make_session() as session, \
+            ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(repos)))) as ex:
+        versions = ex.map(partial(get_latest_release, session=session), repos)
+        for repo, version in zip(repos, versions):
+            print(f"{repo:<35}  {version}")
 
 if __name__ == "__main__":
     main()
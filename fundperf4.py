@@ -1,64 +1,16 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 from openpyxl import Workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.chart import BarChart, Series, Reference
 from openpyxl.chart.label import DataLabelList
 
+from fundperf_fees import WATERFALL_STAGES, calculate_fees
 
-def calculate_fees(investment, total_return_pct, hurdle_rate, perf_fee_rate, mgmt_fee_rate):
-    total_return = total_return_pct / 100
-    hurdle = hurdle_rate / 100
-    perf_fee = perf_fee_rate / 100
-    mgmt_fee = mgmt_fee_rate / 100
-
-    # Step 1: Fees and profits
-    mgmt_fee_amount = investment * mgmt_fee
-    gross_profit = investment * total_return
-    net_profit_before_perf = gross_profit - mgmt_fee_amount
-
-    # Step 2: Performance fee logic
-    if total_return <= hurdle:
-        manager_perf_fee = 0
-        investor_profit = net_profit_before_perf
-        phase = "Below Hurdle"
-    elif total_return <= hurdle * (1 + perf_fee):
-        total_profit = net_profit_before_perf
-        manager_perf_fee = total_profit * perf_fee
-        investor_profit = total_profit - manager_perf_fee
-        phase = "Catch-up Phase"
-    else:
-        total_profit = net_profit_before_perf
-        profit_above_hurdle = total_profit - (investment * hurdle)
-        manager_perf_fee = profit_above_hurdle * perf_fee
-        investor_profit = total_profit - manager_perf_fee
-        phase = "Above Hurdle + Catch-up"
-
-    investor_total = investment + investor_profit
-    total_fees = mgmt_fee_amount + manager_perf_fee
-    eff_fee_pct = (total_fees / gross_profit * 100) if gross_profit > 0 else 0
-
-    # Waterfall data
-    waterfall = [
-        {"Stage": "Initial Capital", "Amount (SGD)": investment},
-        {"Stage": "Gross Return", "Amount (SGD)": gross_profit},
-        {"Stage": "Less: Management Fee", "Amount (SGD)": -mgmt_fee_amount},
-        {"Stage": "Less: Performance Fee", "Amount (SGD)": -manager_perf_fee},
-        {"Stage": "Investor Final Value", "Amount (SGD)": investor_total - investment},
-    ]
-
-    return {
-        "Return %": total_return_pct,
-        "Phase": phase,
-        "Mgmt Fee (SGD)": round(mgmt_fee_amount, 2),
-        "Perf Fee (SGD)": round(manager_perf_fee, 2),
-        "Total Fees (SGD)": round(total_fees, 2),
-        "Investor Profit (SGD)": round(investor_profit, 2),
-        "Investor Total (SGD)": round(investor_total, 2),
-        "Effective Fee %": round(eff_fee_pct, 2),
-        "Waterfall": waterfall
-    }
-
+# xlsxwriter streams rows and charts natively; fall back to openpyxl without it
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
 
 def create_waterfall_chart(ws, data_len):
     """Add a waterfall chart to the Excel sheet."""
@@ -78,6 +30,78 @@ def create_waterfall_chart(ws, data_len):
     ws.add_chart(chart, "E2")
 
 
+def add_waterfall_chart(workbook, ws, data_len):
+    """Add a waterfall chart to an xlsxwriter sheet (same layout as create_waterfall_chart)."""
+    chart = workbook.add_chart({"type": "column"})
+    chart.set_title({"name": "Fund Fee Waterfall Breakdown"})
+    chart.set_style(13)
+    chart.set_y_axis({"name": "SGD"})
+    chart.set_x_axis({"name": "Stage"})
+
+    name = ws.get_name()
+    chart.add_series({
+        "name": [name, 0, 1],
+        "categories": [name, 1, 0, data_len, 0],
+        "values": [name, 1, 1, data_len, 1],
+        "data_labels": {"value": True},
+    })
+
+    ws.insert_chart("E2", chart)
+
+
+def _unique_sheet_name(name, used):
+    """Number repeated sheet names the way openpyxl does ("5.0%", "5.0%1", ...); used holds lowercased names."""
+    title, count = name, 0
+    while title.lower() in used:
+        count += 1
+        title = f"{name}{count}"
+    used.add(title.lower())
+    return title
+
+
+def export_xlsxwriter(filename, df_summary, waterfall):
+    """Write the summary and charted waterfall sheets with xlsxwriter."""
+    workbook = xlsxwriter.Workbook(filename)
+
+    # Write summary
+    ws_summary = workbook.add_worksheet("Summary")
+    ws_summary.write_row(0, 0, df_summary.columns)
+    for row_idx, row in enumerate(df_summary.itertuples(index=False, name=None), 1):
+        ws_summary.write_row(row_idx, 0, row)
+
+    # Create sheets per scenario; repeated returns get numbered names
+    used = {"summary"}
+    for ret, amounts in zip(df_summary["Return %"], waterfall):
+        ws = workbook.add_worksheet(_unique_sheet_name(f"{ret}%", used))
+        ws.write_row(0, 0, ("Stage", "Amount (SGD)"))
+        ws.write_column(1, 0, WATERFALL_STAGES)
+        ws.write_column(1, 1, amounts)
+        add_waterfall_chart(workbook, ws, len(WATERFALL_STAGES))
+
+    workbook.close()
+
+
+def export_openpyxl(filename, df_summary, waterfall):
+    """Stream the summary and charted waterfall sheets through an openpyxl write-only workbook."""
+    wb = Workbook(write_only=True)
+
+    # Write summary
+    ws_summary = wb.create_sheet("Summary")
+    ws_summary.append(list(df_summary.columns))
+    for row in df_summary.itertuples(index=False, name=None):
+        ws_summary.append(row)
+
+    # Create sheets per scenario
+    for ret, amounts in zip(df_summary["Return %"], waterfall):
+        ws = wb.create_sheet(title=f"{ret}%")
+        ws.append(("Stage", "Amount (SGD)"))
+        for stage, amount in zip(WATERFALL_STAGES, amounts.tolist()):
+            ws.append((stage, amount))
+        create_waterfall_chart(ws, len(WATERFALL_STAGES))
+
+    wb.save(filename)
+
+
 def compare_scenarios():
     investment = float(input("Enter investor's capital (e.g. 1000000): "))
     hurdle_rate = float(input("Enter hurdle rate (%) (e.g. 6): "))
@@ -86,8 +110,8 @@ def compare_scenarios():
     returns = input("Enter return scenarios separated by commas (e.g. 5,8,12,15): ")
     returns = [float(x.strip()) for x in returns.split(",")]
 
-    results = [calculate_fees(investment, r, hurdle_rate, perf_fee, mgmt_fee) for r in returns]
-    df_summary = pd.DataFrame([{k: v for k, v in r.items() if k != "Waterfall"} for r in results])
+    summary, waterfall = calculate_fees(investment, returns, hurdle_rate, perf_fee, mgmt_fee, cumulative=False)
+    df_summary = pd.DataFrame(summary)
 
     print("\n=== Scenario Summary ===")
     print(df_summary.to_string(index=False))
@@ -96,23 +120,10 @@ def compare_scenarios():
     if export_choice == "y":
         filename = input("Enter Excel file name (without extension): ").strip() + ".xlsx"
 
-        wb = Workbook()
-        ws_summary = wb.active
-        ws_summary.title = "Summary"
-
-        # Write summary
-        for r in dataframe_to_rows(df_summary, index=False, header=True):
-            ws_summary.append(r)
-
-        # Create sheets per scenario
-        for r in results:
-            ws = wb.create_sheet(title=f"{r['Return %']}%")
-            df_wf = pd.DataFrame(r["Waterfall"])
-            for row in dataframe_to_rows(df_wf, index=False, header=True):
-                ws.append(row)
-            create_waterfall_chart(ws, len(df_wf))
-
-        wb.save(filename)
+        if xlsxwriter:
+            export_xlsxwriter(filename, df_summary, waterfall)
+        else:
+            export_openpyxl(filename, df_summary, waterfall)
         print(f"\n✅ Exported successfully to {filename}")
         print("Sheets included: Summary + one charted sheet per return scenario.")
 
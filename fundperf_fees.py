@@ -0,0 +1,96 @@
+"""
+Vectorized fund fee waterfall shared by fundperf3.py and fundperf4.py.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+WATERFALL_STAGES = [
+    "Initial Capital",
+    "Gross Return",
+    "Less: Management Fee",
+    "Less: Performance Fee",
+    "Investor Final Value",
+]
+
+
+@lru_cache(maxsize=1024)
+def _calculate_fees(investment, total_return_pct, hurdle_rate, perf_fee_rate, mgmt_fee_rate, cumulative):
+    total_return_pct = np.asarray(total_return_pct, dtype=float)
+    total_return = total_return_pct / 100
+    hurdle = hurdle_rate / 100
+    perf_fee = perf_fee_rate / 100
+    mgmt_fee = mgmt_fee_rate / 100
+
+    # Step 1: Management fee
+    investment_col = np.full_like(total_return, investment)
+    mgmt_fee_amount = investment_col * mgmt_fee
+    gross_profit = investment * total_return
+    net_profit_before_perf = gross_profit - mgmt_fee_amount
+
+    # Step 2: Apply performance fee logic: below hurdle, catch-up, above catch-up
+    below = total_return <= hurdle
+    catchup = ~below & (total_return <= hurdle * (1 + perf_fee))
+    manager_perf_fee = np.select(
+        [below, catchup],
+        [0.0, net_profit_before_perf * perf_fee],
+        (net_profit_before_perf - investment * hurdle) * perf_fee,
+    )
+    investor_profit = net_profit_before_perf - manager_perf_fee
+    phase = np.select([below, catchup], ["Below Hurdle", "Catch-up Phase"], "Above Hurdle + Catch-up")
+
+    # Step 3: Results
+    investor_total = investment + investor_profit
+    total_fees = mgmt_fee_amount + manager_perf_fee
+    eff_fee_pct = np.divide(total_fees * 100, gross_profit,
+                            out=np.zeros_like(total_fees), where=gross_profit > 0)
+
+    # Waterfall data: one row of stage amounts (see WATERFALL_STAGES) per scenario
+    if cumulative:
+        waterfall = np.column_stack([
+            investment_col,
+            investment + gross_profit,
+            -mgmt_fee_amount,
+            -manager_perf_fee,
+            investor_total,
+        ])
+    else:
+        waterfall = np.column_stack([
+            investment_col,
+            gross_profit,
+            -mgmt_fee_amount,
+            -manager_perf_fee,
+            investor_total - investment,
+        ])
+
+    summary = {
+        "Return %": total_return_pct,
+        "Phase": phase.astype(object),
+        "Mgmt Fee (SGD)": np.round(mgmt_fee_amount, 2),
+        "Perf Fee (SGD)": np.round(manager_perf_fee, 2),
+        "Total Fees (SGD)": np.round(total_fees, 2),
+        "Investor Profit (SGD)": np.round(investor_profit, 2),
+        "Investor Total (SGD)": np.round(investor_total, 2),
+        "Effective Fee %": np.round(eff_fee_pct, 2),
+    }
+
+    # Cached results are shared between calls, so keep them from being modified
+    for arr in (*summary.values(), waterfall):
+        arr.flags.writeable = False
+    return summary, waterfall
+
+
+def calculate_fees(investment, total_return_pct, hurdle_rate, perf_fee_rate, mgmt_fee_rate, cumulative=True):
+    """
+    Calculate investor and manager results for an array of return scenarios.
+    Returns a dictionary of summary columns (one NumPy array entry per scenario)
+    and an array of waterfall stage amounts with one row per scenario.
+    With cumulative=False the gross return and final value stages hold the change
+    from the initial capital instead of the running total.
+    Results are memoized on the exact inputs; the cached arrays are read-only.
+    """
+    returns = tuple(np.asarray(total_return_pct, dtype=float).ravel().tolist())
+    summary, waterfall = _calculate_fees(float(investment), returns, float(hurdle_rate),
+                                         float(perf_fee_rate), float(mgmt_fee_rate), cumulative)
+    return dict(summary), waterfall
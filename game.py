@@ -2,6 +2,8 @@ import pygame
 import sys
 import random
 import math
+import numpy as np
+from functools import lru_cache
 
 pygame.init()
 
@@ -18,6 +20,11 @@ big_font = pygame.font.SysFont(None, 120)
 mid_font = pygame.font.SysFont(None, 48)
 small_font = pygame.font.SysFont(None, 28)
 
+@lru_cache(maxsize=256)
+def render_text(font, text, color):
+    """Reuse the rendered surface while the same text stays on screen"""
+    return font.render(text, True, color)
+
 # ===== Colors =====
 WHITE = (255, 255, 255)
 GRAY = (180, 180, 180)
@@ -47,29 +54,36 @@ bucket_sway = 0
 bucket_tipping = False
 sway_dir = 1
 
-water_particles = []
-splash_particles = []
+# Particles live in fixed-size arrays; only the first n_* rows are active
+MAX_WATER = 2048
+MAX_SPLASH = 4096
+water_particles = np.empty((MAX_WATER, 3))    # x, y, speed
+splash_particles = np.empty((MAX_SPLASH, 4))  # x, y, vx, vy
+n_water = 0
+n_splash = 0
 
 winner_player = None
 winner_timer = 0
 
 # ===== Drawing Glowing Border =====
-def draw_glow_border():
+def make_glow_border():
+    """Composite the glow rings over black once; it doubles as the frame backdrop"""
+    surf = pygame.Surface((W, H)).convert()
+    surf.fill(BLACK)
     for i in range(10):
         alpha = max(0, 255 - i * 25)
         glow = pygame.Surface((W, H), pygame.SRCALPHA)
         pygame.draw.rect(glow, (0, 120, 255, alpha), (0+i, 0+i, W-i*2, H-i*2), border_radius=20)
-        screen.blit(glow, (0, 0))
+        surf.blit(glow, (0, 0))
+    return surf
 
-# ===== Wooden Bucket =====
-def draw_bucket():
-    global bucket_sway
+glow_border = make_glow_border()
 
-    # Sway effect
-    bucket_sway += 0.03 * sway_dir
-    angle = bucket_angle + math.sin(bucket_sway) * 4
+def draw_glow_border():
+    screen.blit(glow_border, (0, 0))
 
-    # Bucket surface
+# ===== Wooden Bucket =====
+def make_bucket():
     w, h = 160, 120
     surf = pygame.Surface((w, h), pygame.SRCALPHA)
 
@@ -83,99 +97,154 @@ def draw_bucket():
     # Top & bottom metal rings
     pygame.draw.rect(surf, ring_color, (0, 30, w, 12), border_radius=20)
     pygame.draw.rect(surf, ring_color, (0, h-40, w, 12), border_radius=20)
+    return surf
+
+bucket_surf = make_bucket()
+bucket_rotations = {}  # whole degrees -> rotated bucket surface
+
+def draw_bucket():
+    global bucket_sway
+
+    # Sway effect
+    bucket_sway += 0.03 * sway_dir
+    angle = round(bucket_angle + math.sin(bucket_sway) * 4) % 360
 
     # Rotate
-    rotated = pygame.transform.rotate(surf, angle)
+    rotated = bucket_rotations.get(angle)
+    if rotated is None:
+        rotated = bucket_rotations[angle] = pygame.transform.rotate(bucket_surf, angle)
     rect = rotated.get_rect(center=(W//2, 140))
 
     # Rope
-    pygame.draw.line(screen, GRAY, (W//2, 0), (rect.centerx, rect.top), 6)
+    rope = pygame.draw.line(screen, GRAY, (W//2, 0), (rect.centerx, rect.top), 6)
 
     screen.blit(rotated, rect)
-    return rect.centerx, rect.bottom
+    return rect.union(rope)
 
 # ===== Water =====
+def compact(particles, n, keep):
+    """Move the kept rows of particles[:n] to the front; returns the new count"""
+    kept = particles[:n][keep]
+    particles[:len(kept)] = kept
+    return len(kept)
+
 def spawn_water():
-    for _ in range(5):
-        water_particles.append([
-            W//2 + random.randint(-15, 15),  # x
-            150,                             # y
-            random.uniform(4, 7)             # speed
-        ])
+    global n_water
+    k = min(5, MAX_WATER - n_water)
+    p = water_particles[n_water:n_water + k]
+    p[:, 0] = W//2 + np.random.randint(-15, 16, k)  # x
+    p[:, 1] = 150                                   # y
+    p[:, 2] = np.random.uniform(4, 7, k)            # speed
+    n_water += k
 
 def update_water():
-    global splash_particles
-    for p in water_particles:
-        p[1] += p[2]
-        if p[1] >= H - 20:
-            if splash_sound: splash_sound.play()
-            splash_particles.append([p[0], H-20, random.uniform(-3, 3), random.uniform(-3, -1)])
-    water_particles[:] = [p for p in water_particles if p[1] < H - 20]
+    global n_water, n_splash
+    p = water_particles[:n_water]
+    p[:, 1] += p[:, 2]
+    landed = p[:, 1] >= H - 20
+    count = int(landed.sum())
+    if not count:
+        return
+    if splash_sound:
+        for _ in range(count):
+            splash_sound.play()
+
+    # Each landed drop becomes a splash particle
+    k = min(count, MAX_SPLASH - n_splash)
+    s = splash_particles[n_splash:n_splash + k]
+    s[:, 0] = p[landed, 0][:k]
+    s[:, 1] = H - 20
+    s[:, 2] = np.random.uniform(-3, 3, k)
+    s[:, 3] = np.random.uniform(-3, -1, k)
+    n_splash += k
+
+    n_water = compact(water_particles, n_water, ~landed)
 
 def update_splash():
-    for s in splash_particles:
-        s[0] += s[2]
-        s[1] += s[3]
-        s[3] += 0.2
-    splash_particles[:] = [s for s in splash_particles if s[1] < H]
+    global n_splash
+    s = splash_particles[:n_splash]
+    s[:, 0:2] += s[:, 2:4]
+    s[:, 3] += 0.2
+    alive = s[:, 1] < H
+    if not alive.all():
+        n_splash = compact(splash_particles, n_splash, alive)
 
 def draw_water():
-    for p in water_particles:
-        pygame.draw.circle(screen, LIGHT_BLUE, (int(p[0]), int(p[1])), 5)
-
-    for s in splash_particles:
-        pygame.draw.circle(screen, BLUE, (int(s[0]), int(s[1])), 4)
+    """Draw drops and splashes; returns the rects they cover"""
+    drops = [pygame.draw.circle(screen, LIGHT_BLUE, (x, y), 5)
+             for x, y, _ in water_particles[:n_water].astype(int).tolist()]
+    splashes = [pygame.draw.circle(screen, BLUE, (x, y), 4)
+                for x, y, _, _ in splash_particles[:n_splash].astype(int).tolist()]
+    return [group[0].unionall(group[1:]) for group in (drops, splashes) if group]
 
 # ===== Winner Screen =====
 def draw_winner_screen():
-    title = big_font.render(f"Player {winner_player} Wins!", True, WHITE)
-    prompt = mid_font.render("Press R to play again", True, GRAY)
-    screen.blit(title, title.get_rect(center=(W//2, H//2 - 80)))
-    screen.blit(prompt, prompt.get_rect(center=(W//2, H//2 + 20)))
+    title = render_text(big_font, f"Player {winner_player} Wins!", WHITE)
+    prompt = render_text(mid_font, "Press R to play again", GRAY)
+    return [screen.blit(title, title.get_rect(center=(W//2, H//2 - 80))),
+            screen.blit(prompt, prompt.get_rect(center=(W//2, H//2 + 20)))]
+
+# ===== History Panel =====
+@lru_cache(maxsize=4)
+def render_history(rows):
+    """Compose the guess history into one surface; rebuilt only when the rows change"""
+    panel = pygame.Surface((250, 330), pygame.SRCALPHA)
+    panel.blit(render_text(mid_font, "Guesses", WHITE), (0, 0))
+    y = 50
+    for g in rows:
+        c = GREEN if g[1]=="correct" else (BLUE if g[1]=="low" else RED)
+        panel.blit(render_text(small_font, f"P{g[2]}: {g[0]} → {g[1]}", c), (0, y))
+        y += 28
+    return panel
+
+# ===== Display Update =====
+last_scene = None
+last_dirty = []
+
+def present(scene, dirty):
+    """Flip the whole window on scene changes, otherwise only what changed since last frame"""
+    global last_scene, last_dirty
+    if scene != last_scene:
+        pygame.display.flip()
+    else:
+        pygame.display.update(last_dirty + dirty)
+    last_scene, last_dirty = scene, dirty
 
 # ===== Main Draw =====
 def draw():
-    screen.fill(BLACK)
-    draw_glow_border()
+    draw_glow_border()  # opaque, so it also clears the frame
 
     if show_winner:
-        draw_winner_screen()
-        pygame.display.flip()
+        present("winner", draw_winner_screen())
         return
 
     # Top text
-    turn_text = mid_font.render(f"Player {current_player}'s turn", True, WHITE)
-    screen.blit(turn_text, (20, 20))
+    turn_text = render_text(mid_font, f"Player {current_player}'s turn", WHITE)
+    dirty = [screen.blit(turn_text, (20, 20))]
 
     # Range
     span = high - low
     color = GREEN if span <= 5 else (ORANGE if span <= 20 else BLUE)
-    range_text = big_font.render(f"{low} ➜ {high}", True, color)
-    screen.blit(range_text, range_text.get_rect(center=(W//2, H//2)))
+    range_text = render_text(big_font, f"{low} ➜ {high}", color)
+    dirty.append(screen.blit(range_text, range_text.get_rect(center=(W//2, H//2))))
 
     # Input
-    input_box = mid_font.render("Guess: " + (input_text or "_"), True, WHITE)
-    screen.blit(input_box, (20, H - 120))
+    input_box = render_text(mid_font, "Guess: " + (input_text or "_"), WHITE)
+    dirty.append(screen.blit(input_box, (20, H - 120)))
 
-    msg = mid_font.render(message, True, WHITE)
-    screen.blit(msg, (20, H - 70))
+    msg = render_text(mid_font, message, WHITE)
+    dirty.append(screen.blit(msg, (20, H - 70)))
 
     # Bucket
-    bx, by = draw_bucket()
+    dirty.append(draw_bucket())
 
     # Water
-    draw_water()
+    dirty.extend(draw_water())
 
     # History
-    screen.blit(mid_font.render("Guesses", True, WHITE), (W-250, 40))
-    y = 90
-    for g in guesses[-10:]:
-        c = GREEN if g[1]=="correct" else (BLUE if g[1]=="low" else RED)
-        t = small_font.render(f"P{g[2]}: {g[0]} → {g[1]}", True, c)
-        screen.blit(t, (W-250, y))
-        y += 28
+    dirty.append(screen.blit(render_history(tuple(guesses[-10:])), (W-250, 40)))
 
-    pygame.display.flip()
+    present("game", dirty)
 
 
 # ===== Game Loop =====
@@ -199,8 +268,7 @@ while running:
             if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
                 secret, low, high, guesses, input_text, message, current_player, show_winner = new_game()
                 bucket_angle = 0
-                water_particles.clear()
-                splash_particles.clear()
+                n_water = n_splash = 0
             continue
 
         if event.type == pygame.KEYDOWN:
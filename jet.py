@@ -2,6 +2,8 @@ import pygame
 import numpy as np
 import math
 
+from jet_common import edge_chains, draw_edges
+
 # --- Pygame setup ---
 pygame.init()
 WIDTH, HEIGHT = 900, 700
@@ -38,30 +40,32 @@ edges = [
     (10, 12), (11, 12)                # Fin to exhaust
 ]
 
+edge_indices = np.array(edges)
+chains = edge_chains(edges)
+
 # --- Rotation function ---
-def rotate(points, ax, ay):
-    Rx = np.array([
-        [1, 0, 0],
-        [0, math.cos(ax), -math.sin(ax)],
-        [0, math.sin(ax), math.cos(ax)]
+def rotation(ax, ay):
+    """Combined Ry(ay) @ Rx(ax): rotate about x first, then about y."""
+    cx, sx = math.cos(ax), math.sin(ax)
+    cy, sy = math.cos(ay), math.sin(ay)
+    return np.array([
+        [cy, sy * sx, sy * cx],
+        [0, cx, -sx],
+        [-sy, cy * sx, cy * cx]
     ])
-    Ry = np.array([
-        [math.cos(ay), 0, math.sin(ay)],
-        [0, 1, 0],
-        [-math.sin(ay), 0, math.cos(ay)]
-    ])
-    return points @ Rx.T @ Ry.T
+
+# Per-frame spin (1 deg about x, then 0.8 deg about y) as a single matrix
+delta = rotation(math.radians(1), math.radians(0.8))
 
 # --- Projection function ---
 def project(points, scale=300, distance=8):
-    projected = []
-    for x, y, z in points:
-        factor = scale / (z + distance)
-        projected.append((WIDTH // 2 + int(x * factor), HEIGHT // 2 - int(y * factor)))
-    return projected
+    factor = scale / (points[:, 2] + distance)
+    xs = WIDTH // 2 + (points[:, 0] * factor).astype(np.int32)
+    ys = HEIGHT // 2 - (points[:, 1] * factor).astype(np.int32)
+    return np.column_stack((xs, ys))
 
 # --- Main loop ---
-angle_x, angle_y = 0, 0
+orient = np.eye(3)
 running = True
 frame_count = 0
 
@@ -73,20 +77,20 @@ while running:
             running = False
 
     # Rotate F-16
-    rotated = rotate(vertices, math.radians(angle_x), math.radians(angle_y))
+    rotated = vertices @ orient.T
     projected = project(rotated)
 
     # Progressive tracing effect
     edges_to_show = min(len(edges), frame_count // 2 + 1)
 
-    for i, (p1_idx, p2_idx) in enumerate(edges):
-        if i < edges_to_show:
-            pygame.draw.aaline(screen, (0, 255, 255), projected[p1_idx], projected[p2_idx])
+    draw_edges(screen, (0, 255, 255), projected, edge_indices, chains, edges_to_show)
 
-    # Update angles for spinning
-    angle_x += 1
-    angle_y += 0.8
+    # Accumulate the spin; re-orthonormalize now and then to stop drift
+    orient = delta @ orient
     frame_count += 1
+    if frame_count % 1000 == 0:
+        u, _, vt = np.linalg.svd(orient)
+        orient = u @ vt
 
     pygame.display.flip()
     clock.tick(60)
@@ -3,6 +3,8 @@ import pygame
 import numpy as np
 import math
 
+from jet_common import edge_chains, draw_edges
+
 # --- Load OBJ ---
 scene = pywavefront.Wavefront('f16.obj', create_materials=True, collect_faces=True)
 raw_vertices = np.array(scene.vertices)
@@ -14,7 +16,8 @@ for mesh in scene.mesh_list:
         for i in range(len(face)):
             v1, v2 = face[i], face[(i+1) % len(face)]
             edge_set.add(tuple(sorted((v1, v2))))
-edges = list(edge_set)
+edges = np.fromiter((v for e in edge_set for v in e), dtype=np.int32).reshape(-1, 2)
+chains = edge_chains(edges.tolist())
 
 # --- Normalize model ---
 def normalize(vertices):
@@ -26,25 +29,28 @@ def normalize(vertices):
 vertices = normalize(raw_vertices)
 
 # --- Rotation & projection ---
-def rotate(points, ax, ay):
-    Rx = np.array([[1,0,0],[0,math.cos(ax),-math.sin(ax)],[0,math.sin(ax),math.cos(ax)]])
-    Ry = np.array([[math.cos(ay),0,math.sin(ay)],[0,1,0],[-math.sin(ay),0,math.cos(ay)]])
-    return points @ Rx.T @ Ry.T
+def rotation(ax, ay):
+    """Combined Ry(ay) @ Rx(ax): rotate about x first, then about y."""
+    cx, sx = math.cos(ax), math.sin(ax)
+    cy, sy = math.cos(ay), math.sin(ay)
+    return np.array([[cy,sy*sx,sy*cx],[0,cx,-sx],[-sy,cy*sx,cy*cx]])
+
+# Per-frame spin (0.8 deg about x, then 1 deg about y) as a single matrix
+delta = rotation(math.radians(0.8), math.radians(1.0))
 
 WIDTH, HEIGHT = 900, 700
 def project(pts, scale=300, dist=3):
-    proj = []
-    for x, y, z in pts:
-        f = scale / (z + dist)
-        proj.append((WIDTH//2 + int(x * f), HEIGHT//2 - int(y * f)))
-    return proj
+    f = scale / (pts[:, 2] + dist)
+    xs = WIDTH//2 + (pts[:, 0] * f).astype(np.int32)
+    ys = HEIGHT//2 - (pts[:, 1] * f).astype(np.int32)
+    return np.column_stack((xs, ys))
 
 # --- Pygame setup ---
 pygame.init()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("F‑16 Wireframe Animation")
 clock = pygame.time.Clock()
-angle_x = angle_y = 0
+orient = np.eye(3)
 frame = 0
 
 running = True
@@ -54,17 +60,17 @@ while running:
         if evt.type == pygame.QUIT:
             running = False
 
-    rotated = rotate(vertices, math.radians(angle_x), math.radians(angle_y))
+    rotated = vertices @ orient.T
     proj = project(rotated)
     edges_to_show = min(len(edges), frame // 2 + 1)
 
-    for i, (a, b) in enumerate(edges):
-        if i < edges_to_show:
-            pygame.draw.aaline(screen, (0, 255, 255), proj[a], proj[b])
+    draw_edges(screen, (0, 255, 255), proj, edges, chains, edges_to_show)
 
-    angle_x += 0.8
-    angle_y += 1.0
+    orient = delta @ orient
     frame += 1
+    if frame % 1000 == 0:  # re-orthonormalize to stop drift
+        u, _, vt = np.linalg.svd(orient)
+        orient = u @ vt
     pygame.display.flip()
     clock.tick(60)
 
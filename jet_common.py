@@ -0,0 +1,40 @@
+"""
+Polyline batching for the jet wireframe scripts (jet.py and jet2.py).
+"""
+
+from collections import defaultdict
+
+import numpy as np
+import pygame
+
+
+def edge_chains(edges):
+    """Walk unused edges from vertex to vertex; each walk becomes one polyline."""
+    adj = defaultdict(list)
+    for i, (a, b) in reversed(list(enumerate(edges))):
+        adj[a].append((b, i))
+        adj[b].append((a, i))
+    used = [False] * len(edges)
+    chains = []
+    for i, (a, b) in enumerate(edges):
+        if used[i]:
+            continue
+        used[i] = True
+        chain = [a, b]
+        while adj[chain[-1]]:
+            v, j = adj[chain[-1]].pop()
+            if not used[j]:
+                used[j] = True
+                chain.append(v)
+        chains.append(np.array(chain, dtype=np.int32))
+    return chains
+
+
+def draw_edges(surface, color, points, edges, chains, count):
+    """Draw edges[:count]: edge by edge in edge order while tracing, as chained polylines once all are shown"""
+    if count < len(edges):
+        for p1, p2 in points[edges[:count]].tolist():
+            pygame.draw.aaline(surface, color, p1, p2)
+        return
+    for chain in chains:
+        pygame.draw.aalines(surface, color, False, points[chain].tolist())
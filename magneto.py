@@ -2,6 +2,9 @@ import pygame
 import math
 import sys
 import random
+import numpy as np
+
+from circle_stamp import circle_offsets
 
 # Initialize pygame
 pygame.init()
@@ -30,7 +33,12 @@ neptune_magnetosphere = 220
 clock = pygame.time.Clock()
 
 # Solar wind particles
-particles = [{"x": random.randint(-200, WIDTH), "y": random.randint(0, HEIGHT)} for _ in range(200)]
+NUM_PARTICLES = 200
+particles = np.empty((NUM_PARTICLES, 2), dtype=np.float32)
+particles[:, 0] = np.random.randint(-200, WIDTH + 1, NUM_PARTICLES)
+particles[:, 1] = np.random.randint(0, HEIGHT + 1, NUM_PARTICLES)
+
+PARTICLE_DX, PARTICLE_DY = np.array(circle_offsets(2)).T
 
 # Background stars
 stars = [(random.randint(0, WIDTH), random.randint(0, HEIGHT), random.randint(1, 3)) for _ in range(150)]
@@ -39,6 +47,9 @@ stars = [(random.randint(0, WIDTH), random.randint(0, HEIGHT), random.randint(1,
 phase = 0
 frame_count = 0
 
+# Screen areas drawn over the background this frame; main() also redisplays last frame's so vacated spots clear
+dirty_rects = []
+
 # Load planet textures
 earth_img = pygame.image.load("earth.jpg").convert_alpha()
 neptune_img = pygame.image.load("neptune.jpg").convert_alpha()
@@ -47,25 +58,46 @@ neptune_img = pygame.image.load("neptune.jpg").convert_alpha()
 earth_img = pygame.transform.smoothscale(earth_img, (earth_radius * 2, earth_radius * 2))
 neptune_img = pygame.transform.smoothscale(neptune_img, (neptune_radius * 2, neptune_radius * 2))
 
-def draw_background():
-    """Draw stars and a faint Milky Way gradient"""
-    screen.fill(BLACK)
+# Planet labels never change, so render them once
+font = pygame.font.SysFont(None, 36)
+earth_label = font.render("Earth", True, WHITE)
+neptune_label = font.render("Neptune", True, WHITE)
+
+def make_background():
+    """Render stars and a faint Milky Way gradient once"""
+    bg = pygame.Surface((WIDTH, HEIGHT)).convert()
+    bg.fill(BLACK)
 
     for i in range(HEIGHT):
         alpha = int(40 * math.exp(-((i - HEIGHT // 2) ** 2) / (2 * (HEIGHT // 3) ** 2)))
-        pygame.draw.line(screen, (80, 80, 120, alpha), (0, i), (WIDTH, i))
+        pygame.draw.line(bg, (80, 80, 120, alpha), (0, i), (WIDTH, i))
 
     for (x, y, size) in stars:
-        pygame.draw.circle(screen, WHITE, (x, y), size)
+        pygame.draw.circle(bg, WHITE, (x, y), size)
+    return bg
+
+background = make_background()
+
+# Unit circle sampled at the magnetosphere dot positions
+ELLIPSE_STEPS = np.arange(60)
+ELLIPSE_COS = np.cos(2 * np.pi * ELLIPSE_STEPS / 60)
+ELLIPSE_SIN = np.sin(2 * np.pi * ELLIPSE_STEPS / 60)
+
+# Distances along the tail at which the wave is sampled
+TAIL_T = np.arange(0, 400, 20)
+
+def draw_background():
+    screen.blit(background, (0, 0))
 
 def draw_dotted_ellipse(center, left_radius, right_radius, vertical_radius, color, phase_shift):
-    steps = 60
-    for i in range(steps):
-        if (i + phase_shift) % 4 < 2:
-            angle = 2 * math.pi * i / steps
-            x = center[0] + (right_radius if math.cos(angle) > 0 else left_radius) * math.cos(angle)
-            y = center[1] + vertical_radius * math.sin(angle)
-            pygame.draw.circle(screen, color, (int(x), int(y)), 2)
+    rx = np.where(ELLIPSE_COS > 0, right_radius, left_radius)
+    x = center[0] + rx * ELLIPSE_COS
+    y = center[1] + vertical_radius * ELLIPSE_SIN
+    keep = (ELLIPSE_STEPS + phase_shift) % 4 < 2
+    dots = [pygame.draw.circle(screen, color, (px, py), 2)
+            for px, py in np.column_stack((x[keep], y[keep])).astype(np.int32).tolist()]
+    if dots:
+        dirty_rects.append(dots[0].unionall(dots[1:]))
 
 def draw_tail(center, right_radius, color, tail_strength=1.0):
     global frame_count
@@ -74,16 +106,12 @@ def draw_tail(center, right_radius, color, tail_strength=1.0):
     wave_length = 80
     num_lines = int(3 * tail_strength)
 
+    # Every tail line shares the same x samples and wave shape
+    xs = (center[0] + (right_radius // 2) + TAIL_T).tolist()
+    wave = (wave_amplitude * np.sin(TAIL_T / wave_length + frame_count / 20)).astype(np.int32)
     for i in range(-num_lines, num_lines + 1):
-        tail_points = []
-        for t in range(0, 400, 20):
-            x = center[0] + (right_radius // 2) + t
-            y = center[1] + i * line_spacing + int(
-                wave_amplitude * math.sin((t / wave_length) + frame_count / 20)
-            )
-            tail_points.append((x, y))
-        if len(tail_points) > 1:
-            pygame.draw.lines(screen, color, False, tail_points, 1)
+        ys = (center[1] + i * line_spacing + wave).tolist()
+        dirty_rects.append(pygame.draw.lines(screen, color, False, list(zip(xs, ys)), 1))
 
 def draw_planet_with_magnetosphere(center, planet_img, planet_radius, magnetosphere_radius,
                                    compression_factor=1.0, field_strength=1.0,
@@ -100,33 +128,54 @@ def draw_planet_with_magnetosphere(center, planet_img, planet_radius, magnetosph
 
     # Planet texture
     rect = planet_img.get_rect(center=center)
-    screen.blit(planet_img, rect)
+    dirty_rects.append(screen.blit(planet_img, rect))
 
     return left_radius, right_radius, magnetosphere_radius, field_strength
 
 def update_solar_wind(planet_data):
-    for p in particles:
-        p["x"] += 4
-        for (cx, cy, left_r, right_r, vert_r, field_strength) in planet_data:
-            dx = p["x"] - cx
-            dy = p["y"] - cy
-            rx = left_r if dx < 0 else right_r
-            dist = (dx / rx) ** 2 + (dy / (vert_r // 2)) ** 2
-            if dist < 1.2:
-                angle = math.atan2(dy, dx)
-                p["y"] += math.sin(angle) * 2 * field_strength
-                p["x"] += math.cos(angle) * 2 * field_strength
-        if p["x"] > WIDTH + 10:
-            p["x"] = -10
-            p["y"] = random.randint(0, HEIGHT)
-        pygame.draw.circle(screen, SOLAR_WIND, (p["x"], p["y"]), 2)
+    particles[:, 0] += 4
+
+    # One column per planet: (N, P) distances and deflections
+    cx, cy, left_r, right_r, vert_r, field_strength = np.array(planet_data, dtype=np.float32).T
+    dx = particles[:, 0, None] - cx
+    dy = particles[:, 1, None] - cy
+    rx = np.where(dx < 0, left_r, right_r)
+    dist = (dx / rx) ** 2 + (dy / (vert_r // 2)) ** 2
+    near = dist < 1.2
+    if near.any():
+        angle = np.arctan2(dy, dx)
+        push = np.where(near, 2 * field_strength, 0)
+        particles[:, 0] += (np.cos(angle) * push).sum(axis=1)
+        particles[:, 1] += (np.sin(angle) * push).sum(axis=1)
+
+    wrapped = particles[:, 0] > WIDTH + 10
+    count = int(wrapped.sum())
+    if count:
+        particles[wrapped, 0] = -10
+        particles[wrapped, 1] = np.random.randint(0, HEIGHT + 1, count)
+
+    # Stamp every particle's dot straight into the screen pixels
+    xs = particles[:, 0, None].astype(np.int32) + PARTICLE_DX
+    ys = particles[:, 1, None].astype(np.int32) + PARTICLE_DY
+    inside = (xs >= 0) & (xs < WIDTH) & (ys >= 0) & (ys < HEIGHT)
+    pixels = pygame.surfarray.pixels2d(screen)
+    pixels[xs[inside], ys[inside]] = screen.map_rgb(SOLAR_WIND)
+    del pixels  # unlock the screen
+
+    # One small rect per dot: the particles are spread over the whole window, so a union would cover it all
+    left, top = int(PARTICLE_DX.min()), int(PARTICLE_DY.min())
+    w, h = int(PARTICLE_DX.max()) - left + 1, int(PARTICLE_DY.max()) - top + 1
+    dirty_rects.extend(pygame.Rect(x + left, y + top, w, h)
+                       for x, y in particles.astype(np.int32).tolist())
 
 def main():
-    global phase, frame_count
+    global phase, frame_count, dirty_rects
     running = True
+    last_dirty = None
     while running:
         frame_count += 1
         draw_background()
+        dirty_rects = []
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -153,13 +202,15 @@ def main():
             (neptune_pos[0], neptune_pos[1], neptune_left, neptune_right, neptune_vert, neptune_strength)
         ])
 
-        font = pygame.font.SysFont(None, 36)
-        screen.blit(font.render("Earth", True, WHITE),
-                    (earth_pos[0] - 40, earth_pos[1] + earth_radius + 20))
-        screen.blit(font.render("Neptune", True, WHITE),
-                    (neptune_pos[0] - 60, neptune_pos[1] + neptune_radius + 20))
+        dirty_rects.append(screen.blit(earth_label, (earth_pos[0] - 40, earth_pos[1] + earth_radius + 20)))
+        dirty_rects.append(screen.blit(neptune_label, (neptune_pos[0] - 60, neptune_pos[1] + neptune_radius + 20)))
 
-        pygame.display.flip()
+        # The first frame shows the whole background; after that only what changed since the last frame
+        if last_dirty is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(last_dirty + dirty_rects)
+        last_dirty = dirty_rects
         clock.tick(60)
 
     pygame.quit()
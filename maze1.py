@@ -1,6 +1,7 @@
 import pygame
 import random
 import sys
+import numpy as np
 
 # Maze settings
 CELL_SIZE = 20
@@ -18,35 +19,51 @@ pygame.init()
 screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
 pygame.display.set_caption("Random Maze (Press R to regenerate)")
 
+# One pre-filled tile blitted for every wall cell
+WALL_SURF = pygame.Surface((CELL_SIZE, CELL_SIZE)).convert()
+WALL_SURF.fill(BLACK)
+
 # Directions: (dx, dy)
 DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
 
 def generate_maze(width, height):
     """Generate a random maze using recursive backtracking"""
-    maze = [[1 for _ in range(width)] for _ in range(height)]  # 1 = wall, 0 = path
+    maze = np.ones((height, width), dtype=np.uint8)  # 1 = wall, 0 = path
 
-    def carve(x, y):
-        maze[y][x] = 0
-        dirs = DIRECTIONS[:]
-        random.shuffle(dirs)
-        for dx, dy in dirs:
-            nx, ny = x + dx*2, y + dy*2
-            if 0 <= nx < width and 0 <= ny < height and maze[ny][nx] == 1:
-                maze[y + dy][x + dx] = 0
-                carve(nx, ny)
+    # Depth-first carving with an explicit stack of (x, y, remaining directions)
+    shuffle = random.shuffle
 
-    carve(0, 0)
+    x, y = 0, 0
+    maze[y, x] = 0
+    dirs = DIRECTIONS[:]
+    shuffle(dirs)
+    stack = [(x, y, iter(dirs))]
+    while stack:
+        x, y, dirs = stack[-1]
+        for dx, dy in dirs:
+            nx, ny = x + dx * 2, y + dy * 2
+            if 0 <= nx < width and 0 <= ny < height and maze[ny, nx] == 1:
+                maze[y + dy, x + dx] = 0
+                maze[ny, nx] = 0
+                next_dirs = DIRECTIONS[:]
+                shuffle(next_dirs)
+                stack.append((nx, ny, iter(next_dirs)))
+                break
+        else:
+            stack.pop()
     return maze
 
-def draw_maze(maze):
+def find_walls(maze):
+    """Blit list for every wall cell; only changes when the maze is regenerated"""
+    return [(WALL_SURF, (x * CELL_SIZE, y * CELL_SIZE)) for y, x in np.argwhere(maze == 1).tolist()]
+
+def draw_maze(walls):
     screen.fill(WHITE)
-    for y, row in enumerate(maze):
-        for x, cell in enumerate(row):
-            if cell == 1:
-                pygame.draw.rect(screen, BLACK, (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+    screen.blits(walls, doreturn=False)
 
 def main():
     maze = generate_maze(GRID_WIDTH, GRID_HEIGHT)
+    walls = find_walls(maze)
 
     while True:
         for event in pygame.event.get():
@@ -56,8 +73,9 @@ def main():
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:  # Press R to regenerate
                     maze = generate_maze(GRID_WIDTH, GRID_HEIGHT)
+                    walls = find_walls(maze)
 
-        draw_maze(maze)
+        draw_maze(walls)
         pygame.display.flip()
 
 if __name__ == "__main__":
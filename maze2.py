@@ -1,7 +1,16 @@
 import pygame
 import random
 import sys
+import numpy as np
 from collections import deque
+from functools import lru_cache
+
+# Numba compiles the solver BFS to native code; without it the search runs as plain Python
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda func: func
 
 # Maze settings
 CELL_SIZE = 20
@@ -25,6 +34,26 @@ pygame.display.set_caption("Maze Solver BFS Animation (Press R to regenerate)")
 clock = pygame.time.Clock()
 font = pygame.font.SysFont("Arial", 20, bold=True)
 
+@lru_cache(maxsize=8)
+def render_warning(msg):
+    """Reuse the rendered banner while the same warning stays on screen"""
+    return font.render(msg, True, (255, 0, 0))
+
+# One pre-filled tile blitted for every wall cell
+WALL_SURF = pygame.Surface((CELL_SIZE, CELL_SIZE)).convert()
+WALL_SURF.fill(BLACK)
+
+# Explored-cell dot and path diamond, drawn once and blitted at each marked cell
+EXPLORED_SURF = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+pygame.draw.circle(EXPLORED_SURF, BLUE, (CELL_SIZE // 2, CELL_SIZE // 2), CELL_SIZE // 4)
+PATH_SURF = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+pygame.draw.polygon(PATH_SURF, RED, [
+    (CELL_SIZE // 2, CELL_SIZE // 2 - CELL_SIZE // 3),
+    (CELL_SIZE // 2 + CELL_SIZE // 3, CELL_SIZE // 2),
+    (CELL_SIZE // 2, CELL_SIZE // 2 + CELL_SIZE // 3),
+    (CELL_SIZE // 2 - CELL_SIZE // 3, CELL_SIZE // 2)
+])
+
 # Directions: (dx, dy)
 DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
 
@@ -37,124 +66,189 @@ def generate_maze(width, height):
     width = make_odd(width)
     height = make_odd(height)
 
-    maze = [[1 for _ in range(width)] for _ in range(height)]  # 1 = wall, 0 = path
+    maze = np.ones((height, width), dtype=np.uint8)  # 1 = wall, 0 = path
+
+    # Depth-first carving with an explicit stack of (x, y, remaining directions)
+    shuffle = random.shuffle
 
-    def carve(x, y):
-        maze[y][x] = 0
-        dirs = DIRECTIONS[:]
-        random.shuffle(dirs)
+    x, y = 0, height - 1  # start at bottom-left
+    maze[y, x] = 0
+    dirs = DIRECTIONS[:]
+    shuffle(dirs)
+    stack = [(x, y, iter(dirs))]
+    while stack:
+        x, y, dirs = stack[-1]
         for dx, dy in dirs:
             nx, ny = x + dx * 2, y + dy * 2
-            if 0 <= nx < width and 0 <= ny < height and maze[ny][nx] == 1:
-                maze[y + dy][x + dx] = 0
-                carve(nx, ny)
-
-    carve(0, height - 1)  # start at bottom-left
+            if 0 <= nx < width and 0 <= ny < height and maze[ny, nx] == 1:
+                maze[y + dy, x + dx] = 0
+                maze[ny, nx] = 0
+                next_dirs = DIRECTIONS[:]
+                shuffle(next_dirs)
+                stack.append((nx, ny, iter(next_dirs)))
+                break
+        else:
+            stack.pop()
     return maze, width, height
 
 def bfs_reachable(maze, start, width, height):
-    """Return set of cells reachable from start."""
-    q = deque([start])
-    seen = {start}
+    """Return visited flags (indexed y * width + x) of cells reachable from start."""
+    start_idx = start[1] * width + start[0]
+    visited = bytearray(width * height)
+    blocked = bytearray(maze.tobytes())  # walls and already-queued cells, flat like visited
+    visited[start_idx] = blocked[start_idx] = 1
+    q = deque([start_idx])
+    popleft, push = q.popleft, q.append
+    last_x, last_y = width - 1, height - 1
     while q:
-        x, y = q.popleft()
-        for dx, dy in DIRECTIONS:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < width and 0 <= ny < height:
-                if maze[ny][nx] == 0 and (nx, ny) not in seen:
-                    seen.add((nx, ny))
-                    q.append((nx, ny))
-    return seen
+        idx = popleft()
+        y, x = divmod(idx, width)
+        # Neighbours unrolled in DIRECTIONS order: up, right, down, left
+        if y > 0 and not blocked[idx - width]:
+            visited[idx - width] = blocked[idx - width] = 1
+            push(idx - width)
+        if x < last_x and not blocked[idx + 1]:
+            visited[idx + 1] = blocked[idx + 1] = 1
+            push(idx + 1)
+        if y < last_y and not blocked[idx + width]:
+            visited[idx + width] = blocked[idx + width] = 1
+            push(idx + width)
+        if x > 0 and not blocked[idx - 1]:
+            visited[idx - 1] = blocked[idx - 1] = 1
+            push(idx - 1)
+    return visited
 
 def carve_random_tunnel(maze, start, end, width, height):
     """Carve a random-walk tunnel from start to end."""
     x, y = start
     ex, ey = end
-    while (x, y) != (ex, ey):
-        if random.random() < 0.5:  # sometimes move horizontally
-            if x < ex: x += 1
-            elif x > ex: x -= 1
-        else:  # sometimes move vertically
-            if y < ey: y += 1
-            elif y > ey: y -= 1
-        maze[y][x] = 0
+    dx, dy = abs(ex - x), abs(ey - y)
+    n = dx + dy
+    if n == 0:
+        return
+    # Each step goes horizontally on a coin flip until one axis is used up, then along the other
+    horizontal = np.random.random(n) < 0.5
+    h_before = np.cumsum(horizontal) - horizontal  # horizontal steps taken before each step
+    v_before = np.arange(n) - h_before
+    done = int(np.argmax((h_before == dx) | (v_before == dy)))
+    horizontal[done:] = h_before[done] < dx
+    xs = x + np.sign(ex - x) * np.cumsum(horizontal)
+    ys = y + np.sign(ey - y) * np.cumsum(~horizontal)
+    maze[ys, xs] = 0
 
 def ensure_connected(maze, start, end, width, height):
     """Ensure start and end are open and connected.
     Returns maze and a bool indicating if a tunnel was created."""
     sx, sy = start
     ex, ey = end
-    maze[sy][sx] = 0
-    maze[ey][ex] = 0
+    maze[sy, sx] = 0
+    maze[ey, ex] = 0
 
     reachable = bfs_reachable(maze, start, width, height)
-    if end in reachable:
+    if reachable[ey * width + ex]:
         return maze, False  # already connected
 
-    # carve tunnel from nearest reachable cell
-    nearest = min(reachable, key=lambda c: abs(c[0] - ex) + abs(c[1] - ey))
-    carve_random_tunnel(maze, nearest, end, width, height)
+    # carve tunnel from nearest reachable cell (first in packed order on ties)
+    cells = np.flatnonzero(np.frombuffer(reachable, dtype=np.uint8))
+    nearest = int(cells[np.argmin(np.abs(cells % width - ex) + np.abs(cells // width - ey))])
+    carve_random_tunnel(maze, (nearest % width, nearest // width), end, width, height)
     return maze, True
 
-def bfs_search_steps(maze, start, end, width, height):
-    """Run BFS and yield ('explore', explored_list) and ('path', path_list)."""
-    queue = deque([start])
-    came_from = {start: None}
-    explored = []
-
-    while queue:
-        x, y = queue.popleft()
-        explored.append((x, y))
-        yield ("explore", explored[:])
-
-        if (x, y) == end:
-            break
-
-        for dx, dy in DIRECTIONS:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < width and 0 <= ny < height:
-                if maze[ny][nx] == 0 and (nx, ny) not in came_from:
-                    queue.append((nx, ny))
-                    came_from[(nx, ny)] = (x, y)
-
-    if end not in came_from:
-        return  # unreachable (shouldn’t happen after fix)
+@njit(cache=True)
+def bfs_order(maze, start_idx, end_idx, width, height):
+    """Bidirectional BFS over open cells, growing the smaller frontier one layer per step.
+    Returns parents leading from end back to start, the cells in the order they were reached
+    (both packed as y * width + x) and whether the two searches met."""
+    parents = np.full(width * height, -1, np.int32)
+    dist = np.zeros(width * height, np.int32)
+    side = np.zeros(width * height, np.uint8)  # 1 = reached from start, 2 = reached from end
+    order = np.empty(width * height, np.int32)
+    order[0] = start_idx
+    side[start_idx] = 1
+    if start_idx == end_idx:
+        return parents, order[:1], True
+    order[1] = end_idx
+    side[end_idx] = 2
+    frontier = np.array([[0, 1], [1, 2]])  # slice of order holding each side's frontier
+    tail = 2
+    meet_a = meet_b = -1
+    while meet_a < 0:
+        s = 0 if frontier[0, 1] - frontier[0, 0] <= frontier[1, 1] - frontier[1, 0] else 1
+        lo, hi = frontier[s, 0], frontier[s, 1]
+        if lo == hi:
+            break  # this side ran out without meeting the other
+        best = width * height
+        begin = tail  # this layer's cells are appended from here
+        for i in range(lo, hi):
+            idx = order[i]
+            y, x = idx // width, idx % width
+            for dx, dy in ((0, -1), (1, 0), (0, 1), (-1, 0)):  # same order as DIRECTIONS
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < width and 0 <= ny < height and maze[ny, nx] == 0:
+                    n_idx = ny * width + nx
+                    if side[n_idx] == 0:
+                        side[n_idx] = s + 1
+                        parents[n_idx] = idx
+                        dist[n_idx] = dist[idx] + 1
+                        order[tail] = n_idx
+                        tail += 1
+                    elif side[n_idx] != s + 1 and dist[idx] + dist[n_idx] < best:
+                        best = dist[idx] + dist[n_idx]
+                        meet_a, meet_b = (idx, n_idx) if s == 0 else (n_idx, idx)
+        frontier[s, 0], frontier[s, 1] = begin, tail
+
+    # Reverse the end side's parent chain so end leads back through the meeting edge to start
+    prev, cur = meet_a, meet_b
+    while cur != -1:
+        nxt = parents[cur]
+        parents[cur] = prev
+        prev, cur = cur, nxt
+    return parents, order[:tail], meet_a >= 0
+
+
+def bfs_tape(maze, start, end, width, height):
+    """Run BFS once and lay the animation out as an int32 tape of packed cells (y * width + x):
+    the explored cells in the order they were reached, then the path from start to end.
+    Returns the tape and how many of its leading cells are explored cells."""
+    start_idx = start[1] * width + start[0]
+    end_idx = end[1] * width + end[0]
+    parents, order, found = bfs_order(maze, start_idx, end_idx, width, height)
+    if not found:
+        return order, len(order)  # unreachable (shouldn’t happen after fix)
 
     # reconstruct path
+    parents = parents.tolist()
     path = []
-    cur = end
-    while cur is not None:
+    cur = end_idx
+    while cur != -1:
         path.append(cur)
-        cur = came_from.get(cur)
+        cur = parents[cur]
     path.reverse()
+    return np.concatenate((order, np.array(path, dtype=np.int32))), len(order)
+
+def find_walls(maze):
+    """Blit list for every wall cell; only changes when the maze is regenerated."""
+    return [(WALL_SURF, (x * CELL_SIZE, y * CELL_SIZE)) for y, x in np.argwhere(maze == 1).tolist()]
+
+def render_background(maze):
+    """Floor and walls drawn once per maze; each frame starts by blitting this."""
+    background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+    background.fill(WHITE)
+    background.blits(find_walls(maze), doreturn=False)
+    return background
+
+def cell_rect(idx, width):
+    y, x = divmod(int(idx), width)
+    return pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+
+def draw_maze(background, explored, path, start, end, width, height, warning_msg):
+    """Draw the frame from packed explored/path cell arrays; returns the warning banner rect, if one is shown."""
+    screen.blit(background, (0, 0))
 
-    for i in range(len(path)):
-        yield ("path", path[:i+1])
-
-def draw_maze(maze, explored, path, start, end, width, height, warning_msg):
-    screen.fill(WHITE)
-
-    # Draw walls
-    for y, row in enumerate(maze):
-        for x, cell in enumerate(row):
-            if cell == 1:
-                pygame.draw.rect(screen, BLACK, (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-
-    # Explored cells
-    for (x, y) in explored:
-        cx, cy = x * CELL_SIZE + CELL_SIZE // 2, y * CELL_SIZE + CELL_SIZE // 2
-        pygame.draw.circle(screen, BLUE, (cx, cy), CELL_SIZE // 4)
-
-    # Path diamonds
-    for (x, y) in path:
-        cx, cy = x * CELL_SIZE + CELL_SIZE // 2, y * CELL_SIZE + CELL_SIZE // 2
-        points = [
-            (cx, cy - CELL_SIZE // 3),
-            (cx + CELL_SIZE // 3, cy),
-            (cx, cy + CELL_SIZE // 3),
-            (cx - CELL_SIZE // 3, cy)
-        ]
-        pygame.draw.polygon(screen, RED, points)
+    # Explored dots, then path diamonds on top
+    for surf, cells in ((EXPLORED_SURF, explored), (PATH_SURF, path)):
+        xs, ys = (cells % width) * CELL_SIZE, (cells // width) * CELL_SIZE
+        screen.blits([(surf, pos) for pos in zip(xs.tolist(), ys.tolist())], doreturn=False)
 
     # Start/end
     sx, sy = start
@@ -164,8 +258,8 @@ def draw_maze(maze, explored, path, start, end, width, height, warning_msg):
 
     # Warning text
     if warning_msg:
-        text_surface = font.render(warning_msg, True, (255, 0, 0))
-        screen.blit(text_surface, (10, WINDOW_HEIGHT - 30))
+        return screen.blit(render_warning(warning_msg), (10, WINDOW_HEIGHT - 30))
+    return None
 
 def main():
     global GRID_WIDTH, GRID_HEIGHT, WINDOW_WIDTH, WINDOW_HEIGHT
@@ -179,10 +273,13 @@ def main():
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
 
     maze, tunnel_made = ensure_connected(maze, start, end, GRID_WIDTH, GRID_HEIGHT)
-    steps = bfs_search_steps(maze, start, end, GRID_WIDTH, GRID_HEIGHT)
+    background = render_background(maze)
+    tape, n_explored = bfs_tape(maze, start, end, GRID_WIDTH, GRID_HEIGHT)
 
-    explored, path = [], []
+    shown = 0  # how much of the tape is on screen
     warning_timer = 90 if tunnel_made else 0  # show warning for ~3s at 30 FPS
+    full_redraw = True  # flip the whole window after (re)generating
+    last_banner = None
 
     while True:
         for event in pygame.event.get():
@@ -198,25 +295,31 @@ def main():
                     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
 
                     maze, tunnel_made = ensure_connected(maze, start, end, GRID_WIDTH, GRID_HEIGHT)
-                    steps = bfs_search_steps(maze, start, end, GRID_WIDTH, GRID_HEIGHT)
-                    explored, path = [], []
+                    background = render_background(maze)
+                    tape, n_explored = bfs_tape(maze, start, end, GRID_WIDTH, GRID_HEIGHT)
+                    shown = 0
                     warning_timer = 90 if tunnel_made else 0
+                    full_redraw = True
 
-        try:
-            kind, data = next(steps)
-            if kind == "explore":
-                explored = data
-            elif kind == "path":
-                path = data
-        except StopIteration:
-            pass
+        # Each frame exposes one more explored or path cell; only that cell needs presenting
+        dirty = []
+        if shown < len(tape):
+            dirty.append(cell_rect(tape[shown], GRID_WIDTH))
+            shown += 1
 
         msg = "Tunnel created to connect start and end!" if warning_timer > 0 else ""
         if warning_timer > 0:
             warning_timer -= 1
 
-        draw_maze(maze, explored, path, start, end, GRID_WIDTH, GRID_HEIGHT, msg)
-        pygame.display.flip()
+        explored, path = tape[:min(shown, n_explored)], tape[n_explored:shown]
+        banner = draw_maze(background, explored, path, start, end, GRID_WIDTH, GRID_HEIGHT, msg)
+        if full_redraw:
+            pygame.display.flip()
+            full_redraw = False
+        else:
+            dirty.extend(r for r in (banner, last_banner) if r)
+            pygame.display.update(dirty)
+        last_banner = banner
         clock.tick(30)
 
 if __name__ == "__main__":
@@ -0,0 +1,199 @@
+"""
+Maze grid, Kruskal generation, wall rendering and BFS shared by maze_solve1.py and maze_solve3.py.
+"""
+
+import numpy as np
+import pygame
+
+# Numba compiles the BFS to native code; without it the search runs as plain Python
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# --- Maze layout ---
+WIDTH, HEIGHT = 800, 600
+COLS, ROWS = 40, 30  # grid of 20x20 px cells
+CELL_SIZE = WIDTH // COLS
+
+# --- Wall colors ---
+WALL_COLOR = (20, 20, 20)
+PATH_COLOR = (240, 240, 240)
+BORDER_COLOR = (0, 0, 0)
+
+
+# --- Union-Find structure ---
+class DisjointSet:
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.rank = [0] * n
+
+    def find(self, x):
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        # Point every node on the walk straight at the root
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, x, y):
+        root_x = self.find(x)
+        root_y = self.find(y)
+        if root_x == root_y:
+            return False
+        if self.rank[root_x] < self.rank[root_y]:
+            self.parent[root_x] = root_y
+        elif self.rank[root_x] > self.rank[root_y]:
+            self.parent[root_y] = root_x
+        else:
+            self.parent[root_y] = root_x
+            self.rank[root_x] += 1
+        return True
+
+
+# --- Cells ---
+def blit_cells(screen, tile, cells):
+    """Blit tile onto every packed cell index in cells; returns the dirty rects"""
+    return screen.blits([(tile, ((idx % COLS) * CELL_SIZE + 1, (idx // COLS) * CELL_SIZE + 1)) for idx in cells])
+
+
+# --- Walls ---
+def wall_runs(walls):
+    """Find runs of consecutive walls along each row of a boolean grid.
+    Returns the row of each run and the column it starts at and ends before."""
+    padded = np.zeros((walls.shape[0], walls.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = walls
+    rows, edges = np.nonzero(np.diff(padded, axis=1))  # run starts and ends alternate within a row
+    return rows[::2], edges[::2], edges[1::2]
+
+
+def render_walls(bg, vertical_walls, horizontal_walls, area=None):
+    """Draw the walls into the cached background bg; with an area rect, clear it and redraw only walls near it"""
+    x0, y0, x1, y1 = 0, 0, COLS, ROWS
+    if area is not None:
+        x0, y0 = max(area.left // CELL_SIZE - 1, 0), max(area.top // CELL_SIZE - 1, 0)
+        x1, y1 = min(area.right // CELL_SIZE + 2, COLS), min(area.bottom // CELL_SIZE + 2, ROWS)
+    bg.fill(PATH_COLOR, area)
+    # Vertical walls, one line per unbroken run down each column
+    xs, first, last = wall_runs(vertical_walls[y0:y1, x0:x1].T)
+    for px, top, bottom in zip(((xs + x0 + 1) * CELL_SIZE).tolist(), ((first + y0) * CELL_SIZE).tolist(),
+                               ((last + y0) * CELL_SIZE).tolist()):
+        pygame.draw.line(bg, WALL_COLOR, (px, top), (px, bottom), 2)
+    ys, first, last = wall_runs(horizontal_walls[y0:y1, x0:x1])
+    for py, left, right in zip(((ys + y0 + 1) * CELL_SIZE).tolist(), ((first + x0) * CELL_SIZE).tolist(),
+                               ((last + x0) * CELL_SIZE).tolist()):
+        pygame.draw.line(bg, WALL_COLOR, (left, py), (right, py), 2)
+    pygame.draw.rect(bg, BORDER_COLOR, (0, 0, WIDTH, HEIGHT), 3)
+
+
+def open_wall(bg, vertical_walls, horizontal_walls, x, y, wtype):
+    """Remove the wall east ("H") or south ("V") of cell (x, y) and repaint it in bg"""
+    if wtype == "H":
+        vertical_walls[y, x] = False
+        rect = pygame.Rect((x + 1) * CELL_SIZE, y * CELL_SIZE, 2, CELL_SIZE + 1)
+    else:
+        horizontal_walls[y, x] = False
+        rect = pygame.Rect(x * CELL_SIZE, (y + 1) * CELL_SIZE, CELL_SIZE + 1, 2)
+    render_walls(bg, vertical_walls, horizontal_walls, rect)
+    return rect
+
+
+# --- Maze generation (Kruskal) ---
+def generate_maze(cols, rows):
+    """Run Kruskal to completion and return the walls it opens as (x, y, wtype) in order"""
+    num_cells = cols * rows
+    dsu = DisjointSet(num_cells)
+
+    # One row per edge: (cell, neighbour, kind) with kind 0 = east, 1 = south
+    cells = np.arange(num_cells, dtype=np.int32).reshape(rows, cols)
+    east = cells[:, :-1].ravel()
+    south = cells[:-1, :].ravel()
+    edges = np.concatenate((
+        np.stack((east, east + 1, np.zeros_like(east)), axis=1),
+        np.stack((south, south + cols, np.ones_like(south)), axis=1),
+    ))
+    edges = edges[np.random.permutation(len(edges))]
+    events = []
+    for cell1, cell2, kind in edges.tolist():
+        if dsu.union(cell1, cell2):
+            events.append((cell1 % cols, cell1 // cols, "HV"[kind]))
+    return events
+
+
+# --- Build adjacency bitmask ---
+# Each cell stores which of its four sides are open as bits
+UP, RIGHT, DOWN, LEFT = 1, 2, 4, 8
+NEIGHBORS = ((LEFT, -1), (RIGHT, 1), (UP, -COLS), (DOWN, COLS))  # (bit, packed index step)
+
+
+def build_adjacency(vertical_walls, horizontal_walls):
+    """Return a (ROWS, COLS) uint8 grid of open-direction bits"""
+    open_v = ~vertical_walls
+    open_h = ~horizontal_walls
+    nbr_mask = np.zeros((ROWS, COLS), dtype=np.uint8)
+    nbr_mask[:, :-1] |= np.where(open_v, RIGHT, 0).astype(np.uint8)
+    nbr_mask[:, 1:] |= np.where(open_v, LEFT, 0).astype(np.uint8)
+    nbr_mask[:-1, :] |= np.where(open_h, DOWN, 0).astype(np.uint8)
+    nbr_mask[1:, :] |= np.where(open_h, UP, 0).astype(np.uint8)
+    return nbr_mask
+
+
+@njit(cache=True)
+def bfs_order(open_dirs, start, goal):
+    """Bidirectional BFS over the flat open-direction mask, growing the smaller frontier one layer per step.
+    Returns parents leading from goal back to start, the cells in the order they were reached and the step each was reached in."""
+    n = open_dirs.size
+    parents = np.full(n, -1, np.int32)
+    dist = np.zeros(n, np.int32)
+    side = np.zeros(n, np.uint8)  # 1 = reached from start, 2 = reached from goal
+    order = np.empty(n, np.int32)
+    layer = np.zeros(n, np.int32)
+    order[0] = start
+    side[start] = 1
+    if start == goal:
+        return parents, order[:1], layer[:1]
+    order[1] = goal
+    side[goal] = 2
+    frontier = np.array([[0, 1], [1, 2]])  # slice of order holding each side's frontier
+    tail, steps = 2, 0
+    meet_a = meet_b = -1
+    while meet_a < 0:
+        s = 0 if frontier[0, 1] - frontier[0, 0] <= frontier[1, 1] - frontier[1, 0] else 1
+        lo, hi = frontier[s, 0], frontier[s, 1]
+        if lo == hi:
+            break  # this side ran out without meeting the other
+        steps += 1
+        best = n
+        begin = tail  # this layer's cells are appended from here
+        for i in range(lo, hi):
+            current = order[i]
+            for bit, step in NEIGHBORS:
+                if open_dirs[current] & bit:
+                    n_idx = current + step
+                    if side[n_idx] == 0:
+                        side[n_idx] = s + 1
+                        parents[n_idx] = current
+                        dist[n_idx] = dist[current] + 1
+                        order[tail] = n_idx
+                        layer[tail] = steps
+                        tail += 1
+                    elif side[n_idx] != s + 1 and dist[current] + dist[n_idx] < best:
+                        best = dist[current] + dist[n_idx]
+                        meet_a, meet_b = (current, n_idx) if s == 0 else (n_idx, current)
+        frontier[s, 0], frontier[s, 1] = begin, tail
+
+    # Reverse the goal side's parent chain so goal leads back through the meeting edge to start
+    prev, cur = meet_a, meet_b
+    while cur != -1:
+        nxt = parents[cur]
+        parents[cur] = prev
+        prev, cur = cur, nxt
+    return parents, order[:tail], layer[:tail]
+
+
+def bfs_layers(order, layer):
+    """Split the reached cells into one list per search step"""
+    return [wave.tolist() for wave in np.split(order, np.flatnonzero(np.diff(layer)) + 1)]
@@ -1,193 +1,126 @@
 import pygame
-import random
 import time
-from collections import deque
+import numpy as np
+
+from maze_common import (WIDTH, HEIGHT, COLS, ROWS, CELL_SIZE, blit_cells, render_walls, open_wall, generate_maze,
+                         build_adjacency, bfs_order, bfs_layers)
 
 # --- Pygame setup ---
 pygame.init()
-WIDTH, HEIGHT = 800, 600
 SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Maze Generator & Solver - Kruskal + BFS")
 
 # --- Colors ---
-WALL_COLOR = (20, 20, 20)
-PATH_COLOR = (240, 240, 240)
 ACTIVE_COLOR = (0, 180, 255)
 VISITED_COLOR = (255, 210, 80)
 WAVE_COLOR = (255, 100, 50)
 SOLUTION_COLOR = (50, 200, 50)
-BORDER_COLOR = (0, 0, 0)
 
 # --- Maze setup ---
-COLS, ROWS = 40, 30  # grid of 20x20 px cells
-CELL_SIZE = WIDTH // COLS
-GEN_DELAY = 0.002   # delay during maze generation
+GEN_SECONDS = 2     # length of the generation animation
+GEN_FPS = 30
 SOLVE_DELAY = 0.005  # delay during solving
 
-# --- Union-Find structure ---
-class DisjointSet:
-    def __init__(self, n):
-        self.parent = list(range(n))
-        self.rank = [0] * n
-
-    def find(self, x):
-        if self.parent[x] != x:
-            self.parent[x] = self.find(self.parent[x])
-        return self.parent[x]
-
-    def union(self, x, y):
-        root_x = self.find(x)
-        root_y = self.find(y)
-        if root_x == root_y:
-            return False
-        if self.rank[root_x] < self.rank[root_y]:
-            self.parent[root_x] = root_y
-        elif self.rank[root_x] > self.rank[root_y]:
-            self.parent[root_y] = root_x
-        else:
-            self.parent[root_y] = root_x
-            self.rank[root_x] += 1
-        return True
-
-
 # --- Drawing helpers ---
 def draw_cell(x, y, color):
-    pygame.draw.rect(
+    return pygame.draw.rect(
         SCREEN, color,
         (x * CELL_SIZE + 1, y * CELL_SIZE + 1, CELL_SIZE - 2, CELL_SIZE - 2)
     )
 
 
-def draw_walls(vertical_walls, horizontal_walls):
-    SCREEN.fill(PATH_COLOR)
+# Pre-filled cell tiles so each solver frame paints its cells with one blits call
+def cell_tile(color):
+    tile = pygame.Surface((CELL_SIZE - 2, CELL_SIZE - 2)).convert()
+    tile.fill(color)
+    return tile
+
 
-    # Vertical walls
-    for y in range(ROWS):
-        for x in range(COLS - 1):
-            if vertical_walls[y][x]:
-                x1 = (x + 1) * CELL_SIZE
-                y1 = y * CELL_SIZE
-                pygame.draw.line(SCREEN, WALL_COLOR, (x1, y1), (x1, y1 + CELL_SIZE), 2)
+WAVE_SURF = cell_tile(WAVE_COLOR)
+VISITED_SURF = cell_tile(VISITED_COLOR)
+SOLUTION_SURF = cell_tile(SOLUTION_COLOR)
 
-    # Horizontal walls
-    for y in range(ROWS - 1):
-        for x in range(COLS):
-            if horizontal_walls[y][x]:
-                x1 = x * CELL_SIZE
-                y1 = (y + 1) * CELL_SIZE
-                pygame.draw.line(SCREEN, WALL_COLOR, (x1, y1), (x1 + CELL_SIZE, y1), 2)
 
-    # Border
-    pygame.draw.rect(SCREEN, BORDER_COLOR, (0, 0, WIDTH, HEIGHT), 3)
+# Walls live in a cached background; opening a wall repaints only the pixels around it
+MAZE_BG = pygame.Surface((WIDTH, HEIGHT)).convert()
+
+
+def draw_walls():
+    SCREEN.blit(MAZE_BG, (0, 0))
 
 
 # --- Maze generation (animated Kruskal) ---
 def generate_maze_animated(cols, rows):
-    num_cells = cols * rows
-    dsu = DisjointSet(num_cells)
-
-    edges = []
-    for y in range(rows):
-        for x in range(cols):
-            cell = y * cols + x
-            if x < cols - 1:
-                edges.append((cell, cell + 1, "H"))
-            if y < rows - 1:
-                edges.append((cell, cell + cols, "V"))
-
-    random.shuffle(edges)
-    vertical_walls = [[True for _ in range(cols - 1)] for _ in range(rows)]
-    horizontal_walls = [[True for _ in range(cols)] for _ in range(rows - 1)]
-
-    for cell1, cell2, wtype in edges:
+    """Generate the maze, then replay its opened walls over about GEN_SECONDS"""
+    events = generate_maze(cols, rows)
+    vertical_walls = np.ones((rows, cols - 1), dtype=bool)
+    horizontal_walls = np.ones((rows - 1, cols), dtype=bool)
+    render_walls(MAZE_BG, vertical_walls, horizontal_walls)
+    draw_walls()
+    pygame.display.flip()
+
+    clock = pygame.time.Clock()
+    per_frame = max(1, -(-len(events) // (GEN_SECONDS * GEN_FPS)))
+    active = []
+    for i in range(0, len(events), per_frame):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 return None, None
 
-        if dsu.union(cell1, cell2):
-            x1, y1 = cell1 % cols, cell1 // cols
-            x2, y2 = cell2 % cols, cell2 // cols
+        # Clear last frame's highlighted cells, open this frame's walls, then highlight
+        dirty = active
+        for rect in dirty:
+            SCREEN.blit(MAZE_BG, rect, rect)
+        batch = events[i:i + per_frame]
+        for x, y, wtype in batch:
+            rect = open_wall(MAZE_BG, vertical_walls, horizontal_walls, x, y, wtype)
+            SCREEN.blit(MAZE_BG, rect, rect)
+            dirty.append(rect)
+        active = []
+        for x, y, wtype in batch:
+            active.append(draw_cell(x, y, ACTIVE_COLOR))
             if wtype == "H":
-                vertical_walls[y1][x1] = False
+                active.append(draw_cell(x + 1, y, ACTIVE_COLOR))
             else:
-                horizontal_walls[y1][x1] = False
-
-            draw_walls(vertical_walls, horizontal_walls)
-            draw_cell(x1, y1, ACTIVE_COLOR)
-            draw_cell(x2, y2, ACTIVE_COLOR)
-            pygame.display.flip()
-            time.sleep(GEN_DELAY)
+                active.append(draw_cell(x, y + 1, ACTIVE_COLOR))
+        pygame.display.update(dirty + active)
+        clock.tick(GEN_FPS)
 
-    draw_walls(vertical_walls, horizontal_walls)
+    draw_walls()
     pygame.display.flip()
     return vertical_walls, horizontal_walls
 
 
-# --- Build adjacency graph ---
-def build_adjacency(vertical_walls, horizontal_walls):
-    adj = {}
-    for y in range(ROWS):
-        for x in range(COLS):
-            neighbors = []
-            if x > 0 and not vertical_walls[y][x - 1]:
-                neighbors.append((x - 1, y))
-            if x < COLS - 1 and not vertical_walls[y][x]:
-                neighbors.append((x + 1, y))
-            if y > 0 and not horizontal_walls[y - 1][x]:
-                neighbors.append((x, y - 1))
-            if y < ROWS - 1 and not horizontal_walls[y][x]:
-                neighbors.append((x, y + 1))
-            adj[(x, y)] = neighbors
-    return adj
-
-
 # --- Solve using BFS (wave animation) ---
-def solve_maze_wave(adj):
+def solve_maze_wave(nbr_mask):
     start = (0, 0)
     goal = (COLS - 1, ROWS - 1)
 
-    queue = deque([start])
-    visited = {start: None}
-    wave_layers = [[start]]
-
-    found = False
-    while queue and not found:
-        layer = []
-        for _ in range(len(queue)):
-            current = queue.popleft()
-            draw_cell(current[0], current[1], WAVE_COLOR)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    return
-
-            if current == goal:
-                found = True
-                break
-
-            for nx, ny in adj[current]:
-                if (nx, ny) not in visited:
-                    visited[(nx, ny)] = current
-                    queue.append((nx, ny))
-                    layer.append((nx, ny))
-
-        pygame.display.flip()
+    # Cells are packed as y * COLS + x; the search runs up front and the wave is replayed
+    start_idx = start[1] * COLS + start[0]
+    goal_idx = goal[1] * COLS + goal[0]
+    parents, order, layer = bfs_order(nbr_mask.ravel(), start_idx, goal_idx)
+
+    for wave in bfs_layers(order, layer):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+        pygame.display.update(blit_cells(SCREEN, WAVE_SURF, wave))  # only this layer's cells changed
         time.sleep(SOLVE_DELAY)
-        wave_layers.append(layer)
 
     # Draw final visited cells
-    for cell in visited:
-        draw_cell(cell[0], cell[1], VISITED_COLOR)
+    blit_cells(SCREEN, VISITED_SURF, order.tolist())
     pygame.display.flip()
 
     # Trace back the solution
-    cur = goal
-    while cur:
-        draw_cell(cur[0], cur[1], SOLUTION_COLOR)
-        pygame.display.flip()
+    parents = parents.tolist()
+    cur = goal_idx
+    while cur != -1:
+        pygame.display.update(blit_cells(SCREEN, SOLUTION_SURF, (cur,)))
         time.sleep(0.005)
-        cur = visited[cur]
+        cur = parents[cur]
 
 
 # --- Main loop ---
@@ -200,10 +133,10 @@ def main():
     if vertical_walls is None:
         return
 
-    adj = build_adjacency(vertical_walls, horizontal_walls)
+    nbr_mask = build_adjacency(vertical_walls, horizontal_walls)
 
     # Solve maze with animated BFS
-    solve_maze_wave(adj)
+    solve_maze_wave(nbr_mask)
 
     # Keep display until closed
     while running:
@@ -151,11 +151,12 @@ def solve_maze_wave(adj):
     visited = {start: None}
     wave_layers = [[start]]
 
+    popleft, push = queue.popleft, queue.append
     found = False
     while queue and not found:
         layer = []
         for _ in range(len(queue)):
-            current = queue.popleft()
+            current = popleft()
             draw_cell(current[0], current[1], WAVE_COLOR)
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -166,11 +167,11 @@ def solve_maze_wave(adj):
                 found = True
                 break
 
-            for nx, ny in adj[current]:
-                if (nx, ny) not in visited:
-                    visited[(nx, ny)] = current
-                    queue.append((nx, ny))
-                    layer.append((nx, ny))
+            for neighbor in adj[current]:
+                if neighbor not in visited:
+                    visited[neighbor] = current
+                    push(neighbor)
+                    layer.append(neighbor)
 
         pygame.display.flip()
         time.sleep(SOLVE_DELAY)
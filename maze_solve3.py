@@ -1,22 +1,20 @@
 import pygame
-import random
 import time
-from collections import deque
+import numpy as np
+
+from maze_common import (WIDTH, HEIGHT, COLS, ROWS, CELL_SIZE, UP, RIGHT, DOWN, LEFT, blit_cells, render_walls,
+                         open_wall, generate_maze, build_adjacency, bfs_order, bfs_layers)
 
 # --- Pygame setup ---
 pygame.init()
-WIDTH, HEIGHT = 800, 600
 SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Maze Game (Kruskal + BFS + Text Menu)")
 
 # --- Colors ---
-WALL_COLOR = (20, 20, 20)
-PATH_COLOR = (240, 240, 240)
 ACTIVE_COLOR = (0, 180, 255)
 WAVE_COLOR = (255, 180, 80)
 SOLUTION_COLOR = (0, 200, 0)
 PLAYER_COLOR = (0, 100, 255)
-BORDER_COLOR = (0, 0, 0)
 START_COLOR = (100, 255, 100)
 END_COLOR = (255, 100, 100)
 TITLE_COLOR = (0, 200, 255)
@@ -24,9 +22,8 @@ TEXT_COLOR = (255, 255, 255)
 BG_COLOR = (30, 30, 60)
 
 # --- Maze setup ---
-COLS, ROWS = 40, 30
-CELL_SIZE = WIDTH // COLS
-GEN_DELAY = 0.002
+GEN_SECONDS = 2
+GEN_FPS = 30
 SOLVE_DELAY = 0.01
 
 # --- Fonts ---
@@ -35,149 +32,93 @@ TITLE_FONT = pygame.font.SysFont("arial", 50, bold=True)
 SMALL_FONT = pygame.font.SysFont("consolas", 20)
 
 
-# --- Disjoint Set ---
-class DisjointSet:
-    def __init__(self, n):
-        self.parent = list(range(n))
-        self.rank = [0] * n
-
-    def find(self, x):
-        if self.parent[x] != x:
-            self.parent[x] = self.find(self.parent[x])
-        return self.parent[x]
-
-    def union(self, x, y):
-        rx, ry = self.find(x), self.find(y)
-        if rx == ry:
-            return False
-        if self.rank[rx] < self.rank[ry]:
-            self.parent[rx] = ry
-        elif self.rank[rx] > self.rank[ry]:
-            self.parent[ry] = rx
-        else:
-            self.parent[ry] = rx
-            self.rank[rx] += 1
-        return True
-
-
 # --- Drawing ---
 def draw_cell(x, y, color):
-    pygame.draw.rect(SCREEN, color, (x * CELL_SIZE + 1, y * CELL_SIZE + 1, CELL_SIZE - 2, CELL_SIZE - 2))
-
-
-def draw_walls(vertical_walls, horizontal_walls):
-    SCREEN.fill(PATH_COLOR)
-    for y in range(ROWS):
-        for x in range(COLS - 1):
-            if vertical_walls[y][x]:
-                x1 = (x + 1) * CELL_SIZE
-                y1 = y * CELL_SIZE
-                pygame.draw.line(SCREEN, WALL_COLOR, (x1, y1), (x1, y1 + CELL_SIZE), 2)
-    for y in range(ROWS - 1):
-        for x in range(COLS):
-            if horizontal_walls[y][x]:
-                x1 = x * CELL_SIZE
-                y1 = (y + 1) * CELL_SIZE
-                pygame.draw.line(SCREEN, WALL_COLOR, (x1, y1), (x1 + CELL_SIZE, y1), 2)
-    pygame.draw.rect(SCREEN, BORDER_COLOR, (0, 0, WIDTH, HEIGHT), 3)
+    return pygame.draw.rect(SCREEN, color, (x * CELL_SIZE + 1, y * CELL_SIZE + 1, CELL_SIZE - 2, CELL_SIZE - 2))
+
+
+# Pre-filled cell tiles so each solver frame paints its cells with one blits call
+def cell_tile(color):
+    tile = pygame.Surface((CELL_SIZE - 2, CELL_SIZE - 2)).convert()
+    tile.fill(color)
+    return tile
+
+
+WAVE_SURF = cell_tile(WAVE_COLOR)
+SOLUTION_SURF = cell_tile(SOLUTION_COLOR)
+
+
+# Walls live in a cached background; opening a wall repaints only the pixels around it
+MAZE_BG = pygame.Surface((WIDTH, HEIGHT)).convert()
+
+
+def draw_walls():
+    SCREEN.blit(MAZE_BG, (0, 0))
 
 
 # --- Kruskal Maze Generation ---
 def generate_maze_animated(cols, rows):
-    num_cells = cols * rows
-    dsu = DisjointSet(num_cells)
-    edges = []
-    for y in range(rows):
-        for x in range(cols):
-            cell = y * cols + x
-            if x < cols - 1:
-                edges.append((cell, cell + 1, "H"))
-            if y < rows - 1:
-                edges.append((cell, cell + cols, "V"))
-    random.shuffle(edges)
-
-    vertical_walls = [[True for _ in range(cols - 1)] for _ in range(rows)]
-    horizontal_walls = [[True for _ in range(cols)] for _ in range(rows - 1)]
-
-    for cell1, cell2, wtype in edges:
+    """Generate the maze, then replay its opened walls over about GEN_SECONDS"""
+    events = generate_maze(cols, rows)
+    vertical_walls = np.ones((rows, cols - 1), dtype=bool)
+    horizontal_walls = np.ones((rows - 1, cols), dtype=bool)
+    render_walls(MAZE_BG, vertical_walls, horizontal_walls)
+    draw_walls()
+    pygame.display.flip()
+
+    clock = pygame.time.Clock()
+    per_frame = max(1, -(-len(events) // (GEN_SECONDS * GEN_FPS)))
+    active = []
+    for i in range(0, len(events), per_frame):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 return
 
-        if dsu.union(cell1, cell2):
-            x1, y1 = cell1 % cols, cell1 // cols
-            x2, y2 = cell2 % cols, cell2 // cols
+        # Clear last frame's highlighted cells, open this frame's walls, then highlight
+        dirty = active
+        for rect in dirty:
+            SCREEN.blit(MAZE_BG, rect, rect)
+        batch = events[i:i + per_frame]
+        for x, y, wtype in batch:
+            rect = open_wall(MAZE_BG, vertical_walls, horizontal_walls, x, y, wtype)
+            SCREEN.blit(MAZE_BG, rect, rect)
+            dirty.append(rect)
+        active = []
+        for x, y, wtype in batch:
+            active.append(draw_cell(x, y, ACTIVE_COLOR))
             if wtype == "H":
-                vertical_walls[y1][x1] = False
+                active.append(draw_cell(x + 1, y, ACTIVE_COLOR))
             else:
-                horizontal_walls[y1][x1] = False
+                active.append(draw_cell(x, y + 1, ACTIVE_COLOR))
+        pygame.display.update(dirty + active)
+        clock.tick(GEN_FPS)
 
-            draw_walls(vertical_walls, horizontal_walls)
-            draw_cell(x1, y1, ACTIVE_COLOR)
-            draw_cell(x2, y2, ACTIVE_COLOR)
-            pygame.display.flip()
-            time.sleep(GEN_DELAY)
-
-    draw_walls(vertical_walls, horizontal_walls)
+    draw_walls()
     pygame.display.flip()
     return vertical_walls, horizontal_walls
 
 
-# --- Build adjacency list ---
-def build_adjacency(vertical_walls, horizontal_walls):
-    adj = {}
-    for y in range(ROWS):
-        for x in range(COLS):
-            neighbors = []
-            if x > 0 and not vertical_walls[y][x - 1]:
-                neighbors.append((x - 1, y))
-            if x < COLS - 1 and not vertical_walls[y][x]:
-                neighbors.append((x + 1, y))
-            if y > 0 and not horizontal_walls[y - 1][x]:
-                neighbors.append((x, y - 1))
-            if y < ROWS - 1 and not horizontal_walls[y][x]:
-                neighbors.append((x, y + 1))
-            adj[(x, y)] = neighbors
-    return adj
-
-
 # --- BFS Solver ---
-def solve_maze_bfs(adj):
+def solve_maze_bfs(nbr_mask):
     start, goal = (0, 0), (COLS - 1, ROWS - 1)
-    queue = deque([start])
-    visited = {start: None}
-    wave = [start]
+    start_idx, goal_idx = start[1] * COLS + start[0], goal[1] * COLS + goal[0]
+    parents, order, layer = bfs_order(nbr_mask.ravel(), start_idx, goal_idx)
 
-    while queue:
+    for wave in bfs_layers(order, layer):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 return
-
-        next_wave = []
-        for _ in range(len(wave)):
-            current = queue.popleft()
-            draw_cell(current[0], current[1], WAVE_COLOR)
-            if current == goal:
-                queue.clear()
-                break
-            for nx, ny in adj[current]:
-                if (nx, ny) not in visited:
-                    visited[(nx, ny)] = current
-                    queue.append((nx, ny))
-                    next_wave.append((nx, ny))
-
-        pygame.display.flip()
+        pygame.display.update(blit_cells(SCREEN, WAVE_SURF, wave))
         time.sleep(SOLVE_DELAY)
-        wave = next_wave
 
-    cur = goal
-    while cur:
-        draw_cell(cur[0], cur[1], SOLUTION_COLOR)
-        pygame.display.flip()
+    parents = parents.tolist()
+    cur = goal_idx
+    while cur != -1:
+        pygame.display.update(blit_cells(SCREEN, SOLUTION_SURF, (cur,)))
         time.sleep(0.005)
-        cur = visited[cur]
+        cur = parents[cur]
 
 
 # --- Fade-in/out translucent message ---
@@ -215,7 +156,7 @@ def fade_message(message="Press any key to return"):
 
 
 # --- Player Mode ---
-def play_maze(adj, vertical_walls, horizontal_walls):
+def play_maze(nbr_mask):
     player = (0, 0)
     goal = (COLS - 1, ROWS - 1)
     clock = pygame.time.Clock()
@@ -227,19 +168,20 @@ def play_maze(adj, vertical_walls, horizontal_walls):
                 playing = False
             elif event.type == pygame.KEYDOWN:
                 x, y = player
+                open_dirs = nbr_mask[y, x]
                 if event.key == pygame.K_ESCAPE:  # 🔹 ESC to abort
                     playing = False
                     return
-                if event.key == pygame.K_UP and (x, y - 1) in adj[player]:
+                if event.key == pygame.K_UP and open_dirs & UP:
                     player = (x, y - 1)
-                elif event.key == pygame.K_DOWN and (x, y + 1) in adj[player]:
+                elif event.key == pygame.K_DOWN and open_dirs & DOWN:
                     player = (x, y + 1)
-                elif event.key == pygame.K_LEFT and (x - 1, y) in adj[player]:
+                elif event.key == pygame.K_LEFT and open_dirs & LEFT:
                     player = (x - 1, y)
-                elif event.key == pygame.K_RIGHT and (x + 1, y) in adj[player]:
+                elif event.key == pygame.K_RIGHT and open_dirs & RIGHT:
                     player = (x + 1, y)
 
-        draw_walls(vertical_walls, horizontal_walls)
+        draw_walls()
         draw_cell(0, 0, START_COLOR)
         draw_cell(COLS - 1, ROWS - 1, END_COLOR)
         draw_cell(player[0], player[1], PLAYER_COLOR)
@@ -259,7 +201,7 @@ def play_maze(adj, vertical_walls, horizontal_walls):
 # --- Text Menu ---
 def text_menu():
     maze_ready = False
-    vertical_walls = horizontal_walls = adj = None
+    vertical_walls = horizontal_walls = nbr_mask = None
     running = True
 
     while running:
@@ -287,18 +229,18 @@ def text_menu():
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_1:
                     vertical_walls, horizontal_walls = generate_maze_animated(COLS, ROWS)
-                    adj = build_adjacency(vertical_walls, horizontal_walls)
+                    nbr_mask = build_adjacency(vertical_walls, horizontal_walls)
                     maze_ready = True
                     fade_message("Maze generated. Press key to return")
                 elif event.key == pygame.K_2 and maze_ready:
-                    draw_walls(vertical_walls, horizontal_walls)
+                    draw_walls()
                     draw_cell(0, 0, START_COLOR)
                     draw_cell(COLS - 1, ROWS - 1, END_COLOR)
                     pygame.display.flip()
-                    solve_maze_bfs(adj)
+                    solve_maze_bfs(nbr_mask)
                     fade_message()
                 elif event.key == pygame.K_3 and maze_ready:
-                    play_maze(adj, vertical_walls, horizontal_walls)
+                    play_maze(nbr_mask)
                     fade_message("Press a key to return")
                 elif event.key == pygame.K_4:
                     running = False
@@ -8,14 +8,20 @@ Enhanced Order Book Simulator with:
 - Matplotlib depth plotting
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from enum import Enum, auto
 import itertools
+import math
+import numpy as np
 import pandas as pd
-from collections import deque
-from typing import List, Dict, Optional, Tuple
+from array import array
+from typing import Iterable, List, Dict, Optional, Tuple
+import heapq
 import bisect
+import csv
+from operator import attrgetter, itemgetter
 import matplotlib.pyplot as plt
+from sortedcontainers import SortedList
 
 _seq = itertools.count(1)
 
@@ -35,9 +41,8 @@ class OrderType(Enum):
     STOP_LIMIT = "STOP_LIMIT"
     ICEBERG = "ICEBERG"
 
-@dataclass(order=True)
+@dataclass(slots=True)
 class Order:
-    sort_index: Tuple[float, int] = field(init=False, repr=False)
     id: int = field(default_factory=lambda: next(_seq))
     side: Side = Side.BUY
     quantity: int = 0
@@ -50,12 +55,14 @@ class Order:
     display_size: Optional[int] = None
     reserve: int = 0
 
-    def __post_init__(self):
+    @property
+    def sort_index(self) -> Tuple[float, int]:
+        """Price-time priority key (best price first, then oldest); levels are FIFO, so this is only computed on demand"""
         if self.side == Side.BUY:
             price_key = -self.price if self.price is not None else float('-inf')
         else:
             price_key = self.price if self.price is not None else float('inf')
-        self.sort_index = (price_key, self.timestamp)
+        return (price_key, self.timestamp)
 
     @property
     def remaining(self):
@@ -66,7 +73,7 @@ class Order:
         self.filled += qty
         return qty
 
-@dataclass
+@dataclass(slots=True)
 class Trade:
     buy_order_id: int
     sell_order_id: int
@@ -74,123 +81,291 @@ class Trade:
     quantity: int
     timestamp: int = field(default_factory=now_ts)
 
+# One row per executed trade in the book's history, mirroring the Trade fields
+TRADE_DTYPE = np.dtype([
+    ("buy_order_id", np.int64),
+    ("sell_order_id", np.int64),
+    ("price", np.float64),
+    ("quantity", np.int64),
+    ("timestamp", np.int64),
+])
+
+class Level:
+    """FIFO queue of the resting orders at one price, as parallel arrays of order ids and remaining quantities.
+    Entries before head are done; a cancelled order stays in place with nothing remaining until head passes it
+    or holes (cancelled entries past head) outnumber the live ones and the level compacts."""
+    __slots__ = ("price", "ids", "remaining", "head", "base", "holes")
+
+    def __init__(self, price: float):
+        self.price = price
+        self.ids = array("q")
+        self.remaining = array("q")
+        self.head = 0
+        self.base = 0  # positions handed out by append are base + index into the arrays
+        self.holes = 0
+
+    def __len__(self):
+        return len(self.ids) - self.head
+
+    def append(self, order_id: int, qty: int) -> int:
+        self.ids.append(order_id)
+        self.remaining.append(qty)
+        return self.base + len(self.ids) - 1
+
+    def cancel(self, pos: int, positions: Dict[int, int]):
+        i = pos - self.base
+        self.remaining[i] = 0
+        if i == self.head:
+            self.skip_done()
+            return
+        self.holes += 1
+        if self.holes > 32 and 2 * self.holes > len(self):
+            self.compact(positions)
+
+    def skip_done(self):
+        """Move head past the done entry at head and any holes behind it, compacting once most of the arrays are dead"""
+        remaining, head, n = self.remaining, self.head, len(self.remaining)
+        start = head
+        while head < n and remaining[head] == 0:
+            head += 1
+        if head > start:
+            self.holes -= head - start - 1
+        if head > 32 and 2 * head > n:
+            del self.ids[:head]
+            del remaining[:head]
+            self.base += head
+            head = 0
+        self.head = head
+
+    def compact(self, positions: Dict[int, int]):
+        """Drop every done entry, moving the live orders' positions to their new slots"""
+        ids, remaining = array("q"), array("q")
+        for order_id, qty in zip(self.ids[self.head:], self.remaining[self.head:]):
+            if qty:
+                positions[order_id] = self.base + len(ids)
+                ids.append(order_id)
+                remaining.append(qty)
+        self.ids, self.remaining = ids, remaining
+        self.head = 0
+        self.holes = 0
+
+def _write_rows(path: str, cls, records):
+    """Stream dataclass records to CSV, one row at a time, with a header of the dataclass fields"""
+    names = [f.name for f in fields(cls)]
+    row = attrgetter(*names)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(names)
+        writer.writerows(row(r) for r in records)
+
+# Order types that match without a price limit; everything else stops at its limit price
+UNPRICED_TYPES = frozenset({OrderType.MARKET, OrderType.IOC, OrderType.FOK})
+STOP_TYPES = frozenset({OrderType.STOP, OrderType.STOP_LIMIT})
+
+# Source of the matching loop, specialized per incoming side and limit rule by _specialize_match
+_MATCH_TEMPLATE = """
+def match(self, incoming):
+    trades = []
+    opp_book, opp_heap, opp_level_qty = self.{opp_book}, self.{opp_heap}, self.{opp_level_qty}
+    {limit_setup}
+    orders, positions = self.orders, self._positions
+    record_trade, best_tick = self._record_trade, self._best_tick
+    incoming_id, incoming_fill = incoming.id, incoming.fill
+    while incoming.remaining > 0:
+        tick = best_tick(opp_book, opp_heap, opp_level_qty, {sign})
+        if {stop}:
+            break
+        level = opp_book[tick]
+        ids, remaining, trade_price = level.ids, level.remaining, level.price
+        while level and incoming.remaining > 0:
+            head = level.head  # FIFO: the head is the only entry that can trade, and it is never a tombstone
+            resting = orders[ids[head]]
+            qty = min(incoming.remaining, remaining[head])
+            incoming_fill(qty)
+            resting.fill(qty)
+            remaining[head] -= qty
+            opp_level_qty[tick] -= qty
+            t = Trade({trade_ids}, trade_price, qty)
+            trades.append(t)
+            record_trade(t)
+            if resting.remaining == 0:
+                orders.pop(resting.id, None)
+                positions.pop(resting.id, None)
+                level.skip_done()  # also steps over cancelled orders queued behind it
+    return trades
+"""
+
+def _specialize_match(side: Side, priced: bool):
+    """Compile the matching loop for one incoming side, with the side and limit checks folded into the source"""
+    if side == Side.BUY:
+        names = dict(opp_book="sells", opp_heap="_ask_heap", opp_level_qty="sell_level_qty", sign=1,
+                     trade_ids="incoming_id, resting.id", worse=">")
+    else:
+        names = dict(opp_book="buys", opp_heap="_bid_heap", opp_level_qty="buy_level_qty", sign=-1,
+                     trade_ids="resting.id, incoming_id", worse="<")
+    if priced:
+        limit_setup = f"limit_tick = self._tick(incoming.price, Side.{side.name})"
+        stop = f"tick is None or tick {names['worse']} limit_tick"
+    else:
+        limit_setup, stop = "", "tick is None"
+    ns = {}
+    exec(_MATCH_TEMPLATE.format(limit_setup=limit_setup, stop=stop, **names), globals(), ns)
+    return ns["match"]
+
+# Matcher for every (side, type) an order can be submitted with; stops reach it only after converting
+_MATCHERS = {(side, order_type): _specialize_match(side, order_type not in UNPRICED_TYPES)
+             for side in Side for order_type in OrderType if order_type not in STOP_TYPES}
+
 class OrderBook:
-    def __init__(self, symbol:str="TEST"):
+    def __init__(self, symbol:str="TEST", tick_size:float=0.01):
         self.symbol = symbol
-        self.buys: Dict[float, deque] = {}
-        self.sells: Dict[float, deque] = {}
-        self.buy_prices: List[float] = []
-        self.sell_prices: List[float] = []
+        self.tick_size = tick_size
+        # Levels are keyed by integer price ticks, so price comparisons and lookups never touch floats
+        self.buys: Dict[int, Level] = {}
+        self.sells: Dict[int, Level] = {}
+        # Each level's tick sits in its side's heap (bids negated) until the level is empty and reaches the top
+        self._bid_heap: List[int] = []
+        self._ask_heap: List[int] = []
+        # Every heap tick in ascending order for snapshot/plot_depth, kept in step with the heaps;
+        # bids are read best-first through reversed()
+        self._bid_ladder = SortedList()
+        self._ask_ladder = SortedList()
+        # Total remaining quantity per level, kept in step with every add, fill and cancel
+        self.buy_level_qty: Dict[int, int] = {}
+        self.sell_level_qty: Dict[int, int] = {}
         self.orders: Dict[int, Order] = {}
-        self.trades: List[Trade] = []
-        self.stop_orders: List[Order] = []
+        self._positions: Dict[int, int] = {}  # resting order id -> position in its Level
+        self._trades = np.empty(1 << 12, dtype=TRADE_DTYPE)  # grown by doubling
+        self._n_trades = 0
+        # Pending stops as (sort key, submission seq, order), see _add_stop_order
+        self._buy_stops: List[Tuple[float, int, Order]] = []
+        self._sell_stops: List[Tuple[float, int, Order]] = []
+        self._stop_seq = itertools.count()
+
+    @property
+    def trades(self) -> np.ndarray:
+        """Trade history as a TRADE_DTYPE structured array view, oldest first"""
+        return self._trades[:self._n_trades]
+
+    def _record_trade(self, t: Trade):
+        if self._n_trades == len(self._trades):
+            self._trades = np.resize(self._trades, 2 * len(self._trades))
+        self._trades[self._n_trades] = (t.buy_order_id, t.sell_order_id, t.price, t.quantity, t.timestamp)
+        self._n_trades += 1
+
+    def _tick(self, price: float, side: Side) -> int:
+        """Tick of a limit price; off-grid limits round inwards (buys down, sells up) so they are never crossed"""
+        ticks = price / self.tick_size
+        nearest = round(ticks)
+        if abs(ticks - nearest) <= 1e-9 * max(1.0, abs(ticks)):
+            return nearest
+        return math.floor(ticks) if side == Side.BUY else math.ceil(ticks)
 
     def _add_limit_order_to_book(self, order: Order):
-        book = self.buys if order.side == Side.BUY else self.sells
-        price_list = self.buy_prices if order.side == Side.BUY else self.sell_prices
-        if order.price not in book:
-            book[order.price] = deque()
-            bisect.insort(price_list, order.price)
-        book[order.price].append(order)
+        tick = self._tick(order.price, order.side)
+        if order.side == Side.BUY:
+            book, heap, level_qty, key = self.buys, self._bid_heap, self.buy_level_qty, -tick
+        else:
+            book, heap, level_qty, key = self.sells, self._ask_heap, self.sell_level_qty, tick
+        if tick not in book:
+            # Trades print at the level's grid price, which is inside every limit rounded onto it
+            book[tick] = Level(round(tick * self.tick_size, 10))
+            level_qty[tick] = 0
+            heapq.heappush(heap, key)
+            (self._bid_ladder if order.side == Side.BUY else self._ask_ladder).add(tick)
+        self._positions[order.id] = book[tick].append(order.id, order.remaining)
+        level_qty[tick] += order.remaining
         self.orders[order.id] = order
 
     def _remove_order_from_book(self, order: Order):
-        book = self.buys if order.side == Side.BUY else self.sells
-        price_list = self.buy_prices if order.side == Side.BUY else self.sell_prices
-        if order.price not in book:
-            return
-        q = book[order.price]
-        q = deque([o for o in q if o.id != order.id])
-        if q:
-            book[order.price] = q
+        if order.side == Side.BUY:
+            book, level_qty = self.buys, self.buy_level_qty
         else:
-            del book[order.price]
-            price_list.remove(order.price)
+            book, level_qty = self.sells, self.sell_level_qty
+        if order.price is None:
+            return
+        tick = self._tick(order.price, order.side)
+        level = book.get(tick)
+        if not level:
+            return
+        # Cancel in place: the level entry becomes a tombstone; the caller's order object is left as it was.
+        # Level.cancel moves head past leading tombstones, so a non-empty level always starts with a live order.
+        pos = self._positions.pop(order.id, None)
+        if pos is not None:
+            level_qty[tick] -= order.remaining
+            level.cancel(pos, self._positions)
         self.orders.pop(order.id, None)
 
-    def _best_sell_prices(self):
-        return self.sell_prices
+    def _best_tick(self, book: Dict[int, Level], heap: List[int], level_qty: Dict[int, int],
+                   sign: int) -> Optional[int]:
+        """Best live tick on one side (sign -1 for the negated bid heap), evicting emptied levels on the way"""
+        while heap:
+            tick = sign * heap[0]
+            if book[tick]:
+                return tick
+            heapq.heappop(heap)
+            del book[tick]
+            del level_qty[tick]
+            # the evicted tick is the heap top, so it is also the best end of the ladder
+            if sign > 0:
+                self._ask_ladder.pop(0)
+            else:
+                self._bid_ladder.pop()
+        return None
+
+    def _best_sell_ticks(self, depth: Optional[int] = None) -> List[int]:
+        return self._live_ticks(self.sells, self._ask_ladder, depth)
+
+    def _best_buy_ticks(self, depth: Optional[int] = None) -> List[int]:
+        return self._live_ticks(self.buys, reversed(self._bid_ladder), depth)
+
+    @staticmethod
+    def _live_ticks(book: Dict[int, Level], ladder: Iterable[int], depth: Optional[int]) -> List[int]:
+        """The first depth ticks of ladder whose level still holds orders (all of them when depth is None)"""
+        return list(itertools.islice((t for t in ladder if book[t]), depth))
 
-    def _best_buy_prices(self):
-        return sorted(self.buy_prices, reverse=True)
+    def _add_stop_order(self, order: Order):
+        # Buy stops ascend by stop price and sell stops by negated stop price, so the triggered ones are always a prefix
+        if order.side == Side.BUY:
+            bisect.insort(self._buy_stops, (order.stop_price, next(self._stop_seq), order))
+        else:
+            bisect.insort(self._sell_stops, (-order.stop_price, next(self._stop_seq), order))
+
+    @property
+    def stop_orders(self) -> List[Order]:
+        """Pending stop and stop-limit orders in the order they were submitted"""
+        return [o for _, _, o in sorted(self._buy_stops + self._sell_stops, key=itemgetter(1))]
 
     def _trigger_stop_orders(self, last_price: float):
-        triggered = []
-        remain = []
-        for o in self.stop_orders:
-            trigger = False
-            if o.side == Side.BUY and last_price >= o.stop_price:
-                trigger = True
-            if o.side == Side.SELL and last_price <= o.stop_price:
-                trigger = True
-            if trigger:
-                if o.type == OrderType.STOP:
-                    o.type = OrderType.MARKET
-                    o.price = None
-                elif o.type == OrderType.STOP_LIMIT:
-                    o.type = OrderType.LIMIT
-                triggered.append(o)
-            else:
-                remain.append(o)
-        self.stop_orders = remain
-        for o in triggered:
+        n_buy = bisect.bisect_right(self._buy_stops, last_price, key=itemgetter(0))
+        n_sell = bisect.bisect_right(self._sell_stops, -last_price, key=itemgetter(0))
+        if not (n_buy or n_sell):
+            return
+        triggered = self._buy_stops[:n_buy] + self._sell_stops[:n_sell]
+        del self._buy_stops[:n_buy]
+        del self._sell_stops[:n_sell]
+        triggered.sort(key=itemgetter(1))
+        for _, _, o in triggered:
+            if o.type == OrderType.STOP:
+                o.type = OrderType.MARKET
+                o.price = None
+            elif o.type == OrderType.STOP_LIMIT:
+                o.type = OrderType.LIMIT
             self.submit_order(o)
 
-    def _match(self, incoming: Order):
-        trades = []
-        opp_book = self.sells if incoming.side == Side.BUY else self.buys
-        opp_prices = self._best_sell_prices() if incoming.side == Side.BUY else self._best_buy_prices()
-
-        for price in list(opp_prices):
-            if incoming.remaining <= 0:
-                break
-            if incoming.type in [OrderType.MARKET, OrderType.IOC, OrderType.FOK]:
-                price_ok = True
-            else:
-                if incoming.side == Side.BUY:
-                    price_ok = price <= incoming.price
-                else:
-                    price_ok = price >= incoming.price
-            if not price_ok:
-                break
-            q = opp_book[price]
-            i = 0
-            while i < len(q) and incoming.remaining > 0:
-                resting = q[i]
-                if resting.remaining <= 0:
-                    i += 1
-                    continue
-                qty = min(incoming.remaining, resting.remaining)
-                trade_price = resting.price
-                incoming.fill(qty)
-                resting.fill(qty)
-                t = Trade(
-                    buy_order_id = incoming.id if incoming.side==Side.BUY else resting.id,
-                    sell_order_id = resting.id if incoming.side==Side.BUY else incoming.id,
-                    price = trade_price,
-                    quantity = qty
-                )
-                trades.append(t)
-                self.trades.append(t)
-                self._trigger_stop_orders(trade_price)
-                if resting.remaining == 0:
-                    q.remove(resting)
-                    self.orders.pop(resting.id, None)
-                else:
-                    i += 1
-            if not q:
-                del opp_book[price]
-                if incoming.side == Side.BUY:
-                    self.sell_prices.remove(price)
-                else:
-                    self.buy_prices.remove(price)
+    def submit_order(self, order: Order) -> List[Trade]:
+        n_trades = self._n_trades
+        trades = self._submit(order)
+        # Stops trigger between events: once per order, on the price of the last trade it caused
+        if self._n_trades > n_trades:
+            self._trigger_stop_orders(float(self._trades[self._n_trades - 1]["price"]))
         return trades
 
-    def submit_order(self, order: Order) -> List[Trade]:
+    def _submit(self, order: Order) -> List[Trade]:
         if order.quantity <= 0:
             raise ValueError("Quantity must be positive")
-        if order.type in [OrderType.STOP, OrderType.STOP_LIMIT]:
-            self.stop_orders.append(order)
+        if order.type in STOP_TYPES:
+            self._add_stop_order(order)
             return []
         if order.type == OrderType.ICEBERG:
             if order.display_size is None or order.display_size <= 0:
@@ -198,8 +373,8 @@ class OrderBook:
             order.reserve = order.quantity - order.display_size
             order.quantity = order.display_size
 
-        trades = self._match(order)
-        if order.type in [OrderType.IOC, OrderType.MARKET]:
+        trades = _MATCHERS[order.side, order.type](self, order)
+        if order.type in (OrderType.IOC, OrderType.MARKET):
             return trades
         if order.type == OrderType.FOK:
             if sum(t.quantity for t in trades) < order.quantity:
@@ -213,27 +388,26 @@ class OrderBook:
     def snapshot(self, depth:int=5):
         buy_rows = []
         sell_rows = []
-        for p in self._best_buy_prices()[:depth]:
-            q = self.buys[p]
-            buy_rows.append({"price":p, "size":sum(o.remaining for o in q)})
-        for p in self._best_sell_prices()[:depth]:
-            q = self.sells[p]
-            sell_rows.append({"price":p, "size":sum(o.remaining for o in q)})
+        for t in self._best_buy_ticks(depth):
+            buy_rows.append({"price":self.buys[t].price, "size":self.buy_level_qty[t]})
+        for t in self._best_sell_ticks(depth):
+            sell_rows.append({"price":self.sells[t].price, "size":self.sell_level_qty[t]})
         return pd.DataFrame(buy_rows), pd.DataFrame(sell_rows)
 
     def save_to_csv(self, trades_path:str, orders_path:str):
-        pd.DataFrame([t.__dict__ for t in self.trades]).to_csv(trades_path, index=False)
-        pd.DataFrame([o.__dict__ for o in self.orders.values()]).to_csv(orders_path, index=False)
+        with open(trades_path, "w", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(TRADE_DTYPE.names)
+            writer.writerows(self.trades.tolist())
+        _write_rows(orders_path, Order, self.orders.values())
 
     def plot_depth(self):
         buy_depth = []
         sell_depth = []
-        for p in self._best_buy_prices():
-            qty = sum(o.remaining for o in self.buys[p])
-            buy_depth.append((p, qty))
-        for p in self._best_sell_prices():
-            qty = sum(o.remaining for o in self.sells[p])
-            sell_depth.append((p, qty))
+        for t in self._best_buy_ticks():
+            buy_depth.append((self.buys[t].price, self.buy_level_qty[t]))
+        for t in self._best_sell_ticks():
+            sell_depth.append((self.sells[t].price, self.sell_level_qty[t]))
         if buy_depth:
             prices, qtys = zip(*buy_depth)
             plt.step(prices, qtys, label="Bids")
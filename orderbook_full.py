@@ -1,120 +1,245 @@
 
 import pygame
+import pygame.freetype
 import sys
+import os
 import random
 import csv
 import time
-from collections import defaultdict, deque
+import atexit
+from collections import deque, OrderedDict
+from itertools import islice
+import numpy as np
+from sortedcontainers import SortedDict
+
+from orderbook_match import match_levels
 
 # =============================
 # Order Book Engine
 # =============================
 
+# build_kernels.py compiles match_levels ahead of time; the prebuilt module skips the JIT compile on first use
+try:
+    from orderbook_kernels import match_levels as fast_match_levels
+except ImportError:
+    fast_match_levels = match_levels
+
+
+TRADE, SNAPSHOT = 1, 2  # event_type codes in the binary log
+SIDES = ("", "BUY", "SELL")  # side codes in the binary log
+
+
 class OrderBook:
+    LOG_BLOCK = 4096  # events mapped at a time; a full block is converted to CSV and reused
+
     def __init__(self, depth_levels=50, log_file="orderbook_log.csv"):
-        self.bids = defaultdict(int)  # price -> qty
-        self.asks = defaultdict(int)
+        # Integer price level -> resting qty, sorted best first; bids are keyed by -price so both sides ascend.
+        # match_levels only ever sees array copies of the levels an order trades against.
+        self.bid_levels = SortedDict()
+        self.ask_levels = SortedDict()
+        self._fills = np.empty(64, dtype=np.int64)  # scratch per-level fill quantities for match_levels, grown as needed
         self.trades = deque(maxlen=10)
         self.depth_levels = depth_levels
+        self._depth = None  # get_depth() result, dropped whenever an order changes the book
         self.event_id = 0
         self.log_file = log_file
-        self._init_csv()
+        self._init_log()
 
-    def _init_csv(self):
+    def _init_log(self):
         headers = ["event_id", "timestamp", "event_type", "side", "price", "qty"]
         for i in range(1, self.depth_levels+1):
             headers += [f"Bid{i}_Price", f"Bid{i}_Qty", f"Ask{i}_Price", f"Ask{i}_Qty"]
-        with open(self.log_file, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(headers)
+        # One buffered handle and writer for the whole session; events reach it a block at a time
+        self._log_fh = open(self.log_file, "w", newline="", buffering=1 << 20)
+        self._log_writer = csv.writer(self._log_fh)
+        self._log_writer.writerow(headers)
+        self._log_fh.flush()
+        # Events are recorded as fixed-width rows into a memory-mapped block beside the CSV. Each time the
+        # block fills it is converted into CSV rows and reused; close() converts the tail and deletes the .bin,
+        # so after a crash it holds only the last, unconverted block.
+        self._log_dtype = np.dtype([
+            ("event_id", np.int64), ("timestamp", np.float64), ("event_type", np.int8), ("side", np.int8),
+            ("price", np.int64), ("qty", np.int64), ("n_bids", np.int64), ("n_asks", np.int64),
+            ("levels", np.int64, (self.depth_levels, 4)),  # bid price, bid qty, ask price, ask qty per level
+        ])
+        self._log_path = os.path.splitext(self.log_file)[0] + ".bin"
+        self._log = np.memmap(self._log_path, dtype=self._log_dtype, mode="w+", shape=(self.LOG_BLOCK,))
+        self._log_pending = 0  # rows of the block not yet written to the CSV
+        atexit.register(self.close)
 
-    def _log_trade(self, side, price, qty):
+    def _next_record(self, event_type):
+        if self._log_pending == len(self._log):
+            self._flush_log()
         self.event_id += 1
-        row = [self.event_id, time.time(), "TRADE", side, price, qty]
-        row += ["" for _ in range(self.depth_levels*4)]
-        with open(self.log_file, "a", newline="") as f:
-            writer = csv.writer(f)
+        rec = self._log[self._log_pending]  # structured scalar viewing the mapped row
+        self._log_pending += 1
+        rec["event_id"] = self.event_id
+        rec["timestamp"] = time.time()
+        rec["event_type"] = event_type
+        return rec
+
+    def _flush_log(self):
+        """Convert the pending block of events into CSV rows and push them to the file"""
+        blank = ["" for _ in range(self.depth_levels*4)]
+        writer = self._log_writer
+        for event_id, ts, event_type, side, price, qty, n_bids, n_asks, levels in self._log[:self._log_pending].tolist():
+            if event_type == TRADE:
+                writer.writerow([event_id, ts, "TRADE", SIDES[side], price, qty] + blank)
+                continue
+            row = [event_id, ts, "SNAPSHOT", "", "", ""]
+            for i, (bid_p, bid_q, ask_p, ask_q) in enumerate(levels):
+                row += [bid_p, bid_q] if i < n_bids else ["", ""]
+                row += [ask_p, ask_q] if i < n_asks else ["", ""]
             writer.writerow(row)
+        self._log_fh.flush()
+        self._log_pending = 0
+
+    def close(self):
+        """Write out the remaining events, close log_file and remove the scratch .bin block"""
+        if self._log_fh.closed:
+            return
+        self._flush_log()
+        self._log_fh.close()
+        self._log = None
+        os.remove(self._log_path)
+
+    def _log_trade(self, side, price, qty):
+        rec = self._next_record(TRADE)
+        rec["side"] = SIDES.index(side)
+        rec["price"] = price
+        rec["qty"] = qty
 
     def _log_snapshot(self):
-        self.event_id += 1
-        row = [self.event_id, time.time(), "SNAPSHOT", "", "", ""]
-        bids_sorted = sorted(self.bids.items(), key=lambda x: -x[0])[:self.depth_levels]
-        asks_sorted = sorted(self.asks.items(), key=lambda x: x[0])[:self.depth_levels]
-        for i in range(self.depth_levels):
-            if i < len(bids_sorted):
-                row += [bids_sorted[i][0], bids_sorted[i][1]]
-            else:
-                row += ["", ""]
-            if i < len(asks_sorted):
-                row += [asks_sorted[i][0], asks_sorted[i][1]]
-            else:
-                row += ["", ""]
-        with open(self.log_file, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(row)
+        rec = self._next_record(SNAPSHOT)
+        levels = rec["levels"]
+        bids = [(-key, q) for key, q in islice(self.bid_levels.items(), self.depth_levels)]
+        asks = list(islice(self.ask_levels.items(), self.depth_levels))
+        rec["n_bids"], rec["n_asks"] = len(bids), len(asks)
+        if bids:
+            levels[:len(bids), 0:2] = bids
+        if asks:
+            levels[:len(asks), 2:4] = asks
 
     def add_order(self, side, price, qty):
+        if qty <= 0:
+            raise ValueError("Quantity must be positive")
         trades = []
+        self._depth = None
         if side == "BUY":
-            while qty > 0 and self.asks and min(self.asks.keys()) <= price:
-                best_ask = min(self.asks.keys())
-                ask_qty = self.asks[best_ask]
-                trade_qty = min(qty, ask_qty)
-                qty -= trade_qty
-                self.asks[best_ask] -= trade_qty
-                if self.asks[best_ask] == 0:
-                    del self.asks[best_ask]
-                trades.append(("BUY", best_ask, trade_qty))
-                self.trades.appendleft((time.time(), "BUY", best_ask, trade_qty))
-                self._log_trade("BUY", best_ask, trade_qty)
+            book, limit_key = self.ask_levels, price
         else:  # SELL
-            while qty > 0 and self.bids and max(self.bids.keys()) >= price:
-                best_bid = max(self.bids.keys())
-                bid_qty = self.bids[best_bid]
-                trade_qty = min(qty, bid_qty)
-                qty -= trade_qty
-                self.bids[best_bid] -= trade_qty
-                if self.bids[best_bid] == 0:
-                    del self.bids[best_bid]
-                trades.append(("SELL", best_bid, trade_qty))
-                self.trades.appendleft((time.time(), "SELL", best_bid, trade_qty))
-                self._log_trade("SELL", best_bid, trade_qty)
+            book, limit_key = self.bid_levels, -price
+        # Peek the best opposite level first: an order that doesn't cross rests without touching the matcher
+        if book and book.peekitem(0)[0] <= limit_key:
+            # Only the levels inside the limit can trade, so only they are copied out for the kernel
+            crossing = list(book.irange(maximum=limit_key))
+            keys = np.array(crossing, dtype=np.int64)
+            qtys = np.fromiter(map(book.__getitem__, crossing), dtype=np.int64, count=len(crossing))
+            if len(self._fills) < len(keys):
+                self._fills = np.empty(2 * len(keys), dtype=np.int64)
+            fills = self._fills
+            qty, hit = fast_match_levels(keys, qtys, fills, limit_key, qty)
+            qty = int(qty)
+            for key, trade_qty, left in zip(keys[:hit].tolist(), fills[:hit].tolist(), qtys[:hit].tolist()):
+                trade_price = key if side == "BUY" else -key
+                trades.append((side, trade_price, trade_qty))
+                self.trades.appendleft((time.time(), side, trade_price, trade_qty))
+                self._log_trade(side, trade_price, trade_qty)
+                if left:
+                    book[key] = left
+                else:
+                    del book[key]
         if qty > 0:
-            if side == "BUY":
-                self.bids[price] += qty
-            else:
-                self.asks[price] += qty
+            self._rest(side, price, qty)
         self._log_snapshot()
         return trades
 
+    def _rest(self, side, price, qty):
+        """Add qty to the level at price on side, creating the level if needed"""
+        if side == "BUY":
+            book, key = self.bid_levels, -price
+        else:
+            book, key = self.ask_levels, price
+        book[key] = book.get(key, 0) + qty
+
     def get_depth(self):
-        bids_sorted = sorted(self.bids.items(), key=lambda x: -x[0])[:self.depth_levels]
-        asks_sorted = sorted(self.asks.items(), key=lambda x: x[0])[:self.depth_levels]
-        return bids_sorted, asks_sorted
+        """Top depth_levels (price, qty) pairs per side, best first; shared between calls until the book changes"""
+        if self._depth is None:
+            depth = self.depth_levels
+            bids_sorted = [(-key, q) for key, q in islice(self.bid_levels.items(), depth)]
+            asks_sorted = list(islice(self.ask_levels.items(), depth))
+            self._depth = bids_sorted, asks_sorted
+        return self._depth
 
     def best_bid(self):
-        return max(self.bids.keys()) if self.bids else None
+        return -self.bid_levels.peekitem(0)[0] if self.bid_levels else None
 
     def best_ask(self):
-        return min(self.asks.keys()) if self.asks else None
+        return self.ask_levels.peekitem(0)[0] if self.ask_levels else None
 
 # =============================
 # Pygame Visualizer
 # =============================
 
 class Visualizer:
+    TEXT_CACHE_SIZE = 512
+
     def __init__(self, book: OrderBook):
         pygame.init()
         self.book = book
         self.width, self.height = 800, 600
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Order Book Simulator")
-        self.font = pygame.font.SysFont("consolas", 18)
+        pygame.freetype.init()
+        self.font = pygame.freetype.SysFont("consolas", 18)
         self.clock = pygame.time.Clock()
         self.flash_rows = {}  # price -> flash time
         self.running = True
         self.random_mode = True
+        # In-window order entry: "BUY"/"SELL" while typing "price qty", None otherwise
+        self.input_mode = None
+        self.input_buffer = ""
+        self._dirty = True  # redraw needed; frames where nothing changed keep the last framebuffer
+        self._text_cache = OrderedDict()  # (text, color) -> rendered Surface, least recently used first
+
+    def _text(self, text, color):
+        """Rendered text surface, from an LRU cache bounded at TEXT_CACHE_SIZE surfaces"""
+        key = (text, color)
+        surf = self._text_cache.get(key)
+        if surf is None:
+            surf = self._text_cache[key] = self.font.render(text, color)[0]
+            if len(self._text_cache) > self.TEXT_CACHE_SIZE:
+                self._text_cache.popitem(last=False)
+        else:
+            self._text_cache.move_to_end(key)
+        return surf
+
+    def _place(self, side, price, qty):
+        """Send an order to the book and flash every level it traded at"""
+        for _, p, _ in self.book.add_order(side, price, qty):
+            self.flash_rows[p] = 30
+        self._dirty = True
+
+    def handle_input_key(self, event):
+        """Edit the order entry line; Enter submits "price qty", Escape cancels"""
+        if event.key == pygame.K_RETURN:
+            side, text = self.input_mode, self.input_buffer
+            self.input_mode, self.input_buffer = None, ""
+            self._dirty = True
+            try:
+                price, qty = map(int, text.split())
+            except ValueError:
+                return
+            if qty <= 0:
+                return
+            self._place(side, price, qty)
+        elif event.key == pygame.K_ESCAPE:
+            self.input_mode, self.input_buffer = None, ""
+        elif event.key == pygame.K_BACKSPACE:
+            self.input_buffer = self.input_buffer[:-1]
+        elif event.unicode.isdigit() or event.unicode == " ":
+            self.input_buffer += event.unicode
+        self._dirty = True
 
     def draw(self):
         self.screen.fill((20, 20, 20))
@@ -130,23 +255,23 @@ class Visualizer:
                 flash = self.flash_rows.get(price, 0)
                 color = (0, 255, 0) if flash <= 0 else (255, 255, 0)
                 pygame.draw.rect(self.screen, (0, 80, 0), (mid_x-200, y, 200, row_h))
-                text = self.font.render(f"{price:>5} | {qty:<5}", True, color)
+                text = self._text(f"{price:>5} | {qty:<5}", color)
                 self.screen.blit(text, (mid_x-200, y))
             if i < len(asks):
                 price, qty = asks[i]
                 flash = self.flash_rows.get(price, 0)
                 color = (255, 0, 0) if flash <= 0 else (255, 255, 0)
                 pygame.draw.rect(self.screen, (80, 0, 0), (mid_x, y, 200, row_h))
-                text = self.font.render(f"{price:>5} | {qty:<5}", True, color)
+                text = self._text(f"{price:>5} | {qty:<5}", color)
                 self.screen.blit(text, (mid_x, y))
 
         # Draw trades panel
         y = self.height - 200
-        self.screen.blit(self.font.render("Recent Trades:", True, (255, 255, 255)), (20, y))
+        self.screen.blit(self._text("Recent Trades:", (255, 255, 255)), (20, y))
         for i, trade in enumerate(list(self.book.trades)[:8]):
             t, side, price, qty = trade
             color = (0, 255, 0) if side == "BUY" else (255, 0, 0)
-            text = self.font.render(f"{side} {qty}@{price}", True, color)
+            text = self._text(f"{side} {qty}@{price}", color)
             self.screen.blit(text, (20, y + 20 + i*20))
 
         # Draw bid/ask % bar bottom-right
@@ -160,9 +285,15 @@ class Visualizer:
             x, y = self.width - bar_w - 20, self.height - bar_h - 20
             pygame.draw.rect(self.screen, (0, 255, 0), (x, y, int(bar_w*bid_pct), bar_h))
             pygame.draw.rect(self.screen, (255, 0, 0), (x+int(bar_w*bid_pct), y, int(bar_w*ask_pct), bar_h))
-            text = self.font.render(f"Bids {int(bid_pct*100)}% / Asks {int(ask_pct*100)}%", True, (255, 255, 255))
+            text = self._text(f"Bids {int(bid_pct*100)}% / Asks {int(ask_pct*100)}%", (255, 255, 255))
             self.screen.blit(text, (x, y-20))
 
+        # Draw order entry prompt top-left
+        if self.input_mode is not None:
+            # Changes every keystroke, so it is drawn straight onto the screen rather than cached
+            prompt = f"{self.input_mode} price qty: {self.input_buffer}_"
+            self.font.render_to(self.screen, (20, 20), prompt, (255, 255, 255))
+
         pygame.display.flip()
 
     def run(self):
@@ -170,45 +301,33 @@ class Visualizer:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.running = False
+                elif event.type == pygame.KEYDOWN and self.input_mode is not None:
+                    self.handle_input_key(event)
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         self.running = False
                     elif event.key == pygame.K_r:
                         self.random_mode = not self.random_mode
                     elif event.key == pygame.K_b:
-                        try:
-                            price = int(input("Buy price: "))
-                            qty = int(input("Buy qty: "))
-                            trades = self.book.add_order("BUY", price, qty)
-                            for _, p, _ in trades:
-                                self.flash_rows[p] = 30
-                        except:
-                            pass
+                        self.input_mode, self.input_buffer = "BUY", ""
+                        self._dirty = True
                     elif event.key == pygame.K_s:
-                        try:
-                            price = int(input("Sell price: "))
-                            qty = int(input("Sell qty: "))
-                            trades = self.book.add_order("SELL", price, qty)
-                            for _, p, _ in trades:
-                                self.flash_rows[p] = 30
-                        except:
-                            pass
+                        self.input_mode, self.input_buffer = "SELL", ""
+                        self._dirty = True
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     x, y = event.pos
                     row = (y - 50) // 20
                     bids, asks = self.book.get_depth()
                     if x < self.width//2 and row < len(bids):  # left side = BUY
                         price = bids[row][0]
-                        trades = self.book.add_order("BUY", price, random.randint(1, 5))
-                        for _, p, _ in trades:
-                            self.flash_rows[p] = 30
+                        self._place("BUY", price, random.randint(1, 5))
                     elif x > self.width//2 and row < len(asks):  # right side = SELL
                         price = asks[row][0]
-                        trades = self.book.add_order("SELL", price, random.randint(1, 5))
-                        for _, p, _ in trades:
-                            self.flash_rows[p] = 30
+                        self._place("SELL", price, random.randint(1, 5))
 
-            # Flash decay
+            # Flash decay; a fading row needs redrawing until its last frame clears
+            if self.flash_rows:
+                self._dirty = True
             for p in list(self.flash_rows.keys()):
                 self.flash_rows[p] -= 1
                 if self.flash_rows[p] <= 0:
@@ -218,11 +337,13 @@ class Visualizer:
                 side = random.choice(["BUY", "SELL"])
                 price = random.randint(90, 110)
                 qty = random.randint(1, 5)
-                trades = self.book.add_order(side, price, qty)
-                for _, p, _ in trades:
-                    self.flash_rows[p] = 30
+                self._place(side, price, qty)
 
-            self.draw()
+            if self._dirty:
+                self.draw()
+                self._dirty = False
+            else:
+                pygame.display.flip()
             self.clock.tick(10)
 
         pygame.quit()
@@ -5,17 +5,28 @@ Features:
 - Aggregates orders by price level and shows top N levels for bids and asks (depth table).
 - Top percentage bar showing Bid vs Ask ratio (based on summed visible depth).
 - Grid-style order book similar to the attached screenshot: Bid rows on left (green), Ask rows on right (red).
-- Manual order placement with B/S keys (console input), toggle random flow with R, ESC to exit.
-- Random simulation enabled by default.
+- Manual order placement with B/S keys (type "price qty" in the window), toggle random flow with R, ESC to exit.
+- Random simulation enabled by default, run on a background engine thread decoupled from the frame rate.
 """
 
 import pygame
 import random
-import bisect
-from collections import deque
+import threading
+import time
+from collections import deque, OrderedDict
+from sortedcontainers import SortedDict
 from dataclasses import dataclass, field
 from enum import Enum
 import itertools
+from itertools import islice
+import numpy as np
+
+# Numba compiles the level-filling loop to native code; without it the loop runs as plain Python
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda func: func
 
 _seq = itertools.count(1)
 def now_ts(): return next(_seq)
@@ -25,7 +36,7 @@ class Side(Enum):
     BUY = "BUY"
     SELL = "SELL"
 
-@dataclass
+@dataclass(slots=True)
 class Order:
     id: int = field(default_factory=lambda: next(_seq))
     side: Side = Side.BUY
@@ -38,117 +49,169 @@ class Order:
     def remaining(self):
         return max(0, self.quantity - self.filled)
 
-class Trade:
-    def __init__(self, buy_id, sell_id, price, qty):
-        self.buy_id = buy_id
-        self.sell_id = sell_id
-        self.price = price
-        self.qty = qty
+@njit(cache=True)
+def fill_level(remaining, head, tail, qty, fills):
+    """Fill qty against the FIFO queue remaining[head:tail], oldest first, recording each order's fill in fills.
+    Returns the unfilled qty, how many orders were used up and how many traded at all."""
+    i = head
+    while qty > 0 and i < tail:
+        take = min(qty, remaining[i])
+        remaining[i] -= take
+        fills[i - head] = take
+        qty -= take
+        if remaining[i] > 0:
+            return qty, i - head, i - head + 1
+        i += 1
+    return qty, i - head, i - head
+
+class Level:
+    """Orders resting at one price in time priority, with their remaining qty mirrored in an int64 array for fill_level.
+    Entries before head are filled; the arrays are compacted once most of them are."""
+    __slots__ = ("orders", "remaining", "head")
+
+    def __init__(self):
+        self.orders = []
+        self.remaining = np.empty(8, dtype=np.int64)
+        self.head = 0
+
+    def __len__(self):
+        return len(self.orders) - self.head
+
+    def append(self, order: Order):
+        n = len(self.orders)
+        if n == len(self.remaining):
+            self.remaining = np.resize(self.remaining, 2 * n)
+        self.remaining[n] = order.remaining
+        self.orders.append(order)
+
+    def pop_filled(self, count):
+        """Move head past count filled orders"""
+        head = self.head + count
+        n = len(self.orders)
+        if head > 32 and 2 * head > n:
+            del self.orders[:head]
+            self.remaining[:n - head] = self.remaining[head:n]
+            head = 0
+        self.head = head
+
+TICKS_PER_UNIT = 100  # prices are keyed in whole cents
+
+def to_tick(price):
+    return round(price * TICKS_PER_UNIT)
 
 class OrderBook:
     def __init__(self):
-        # price -> deque of orders (time priority)
-        self.buys = {}   # price -> deque
-        self.sells = {}
-        self.buy_prices = []   # descending maintained separately
-        self.sell_prices = []  # ascending
+        # price tick -> Level of resting orders, kept in ascending order: best bid last, best ask first
+        self.buys = SortedDict()
+        self.sells = SortedDict()
+        # price tick -> total remaining qty at that level, updated on every add and fill
+        self.buy_qty = {}
+        self.sell_qty = {}
         self.orders = {}
-        self.trades = []
-
-    def _add_level(self, price_list, price, descending=False):
-        # insert price into sorted list (keep uniq)
-        if price in price_list: return
-        if descending:
-            # maintain descending by inserting position for -price
-            idx = bisect.bisect_left([-p for p in price_list], -price)
-            price_list.insert(idx, price)
-        else:
-            bisect.insort_left(price_list, price)
+        # Trade history as parallel columns, the first trade_count rows valid; grown by doubling
+        self.trades_buy_id = np.empty(1 << 12, dtype=np.int64)
+        self.trades_sell_id = np.empty(1 << 12, dtype=np.int64)
+        self.trades_price = np.empty(1 << 12, dtype=np.float64)
+        self.trades_qty = np.empty(1 << 12, dtype=np.int64)
+        self.trade_count = 0
+        self._dirty = True  # set on every change to the resting book; cleared by whoever snapshots it
+        self._fills = np.empty(64, dtype=np.int64)  # scratch per-order fill quantities for fill_level, grown as needed
 
-    def add_limit(self, order: Order):
-        book = self.buys if order.side == Side.BUY else self.sells
-        prices = self.buy_prices if order.side == Side.BUY else self.sell_prices
-        if order.price not in book:
-            book[order.price] = deque()
-            self._add_level(prices, order.price, descending=(order.side==Side.BUY))
-        book[order.price].append(order)
+    def _add(self, order: Order):
+        book, qty_map = (self.buys, self.buy_qty) if order.side == Side.BUY else (self.sells, self.sell_qty)
+        tick = to_tick(order.price)
+        level = book.get(tick)
+        if level is None:
+            level = book[tick] = Level()
+        level.append(order)
+        qty_map[tick] = qty_map.get(tick, 0) + order.remaining
         self.orders[order.id] = order
-        return self.match(order)  # attempt match immediately
+        self._dirty = True
+
+    def _reserve_trades(self, n):
+        need = self.trade_count + n
+        size = len(self.trades_qty)
+        if need > size:
+            while size < need:
+                size *= 2
+            self.trades_buy_id = np.resize(self.trades_buy_id, size)
+            self.trades_sell_id = np.resize(self.trades_sell_id, size)
+            self.trades_price = np.resize(self.trades_price, size)
+            self.trades_qty = np.resize(self.trades_qty, size)
+
+    def add_limit(self, order: Order):
+        return self.match(order)  # attempt match immediately; match rests whatever is left
 
     def match(self, incoming: Order):
         """Match incoming order against opposite book using price-time priority at aggregated levels."""
         trades = []
-        if incoming.side == Side.BUY:
-            # match against lowest asks first (ascending sell_prices)
-            for price in list(self.sell_prices):
-                if incoming.remaining <= 0: break
-                if price > incoming.price: break  # limit check
-                q = self.sells[price]
-                while q and incoming.remaining > 0:
-                    resting = q[0]
-                    qty = min(incoming.remaining, resting.remaining)
-                    incoming.filled += qty
-                    resting.filled += qty
-                    trades.append(Trade(incoming.id, resting.id, price, qty))
-                    self.trades.append((price, qty))
-                    if resting.remaining == 0:
-                        q.popleft()
-                        self.orders.pop(resting.id, None)
-                if not q:
-                    del self.sells[price]
-                    self.sell_prices.remove(price)
+        is_buy = incoming.side == Side.BUY
+        if is_buy:
+            # match against lowest asks first
+            book, qty_map, best = self.sells, self.sell_qty, 0
         else:
             # SELL incoming: match against highest buys first
-            for price in list(self.buy_prices):
-                if incoming.remaining <= 0: break
-                if price < incoming.price: break
-                q = self.buys[price]
-                while q and incoming.remaining > 0:
-                    resting = q[0]
-                    qty = min(incoming.remaining, resting.remaining)
-                    incoming.filled += qty
-                    resting.filled += qty
-                    trades.append(Trade(resting.id, incoming.id, price, qty))
-                    self.trades.append((price, qty))
-                    if resting.remaining == 0:
-                        q.popleft()
-                        self.orders.pop(resting.id, None)
-                if not q:
-                    del self.buys[price]
-                    self.buy_prices.remove(price)
+            book, qty_map, best = self.buys, self.buy_qty, -1
+        limit = to_tick(incoming.price)
+        while incoming.remaining > 0 and book:
+            tick, level = book.peekitem(best)
+            if (tick > limit) if is_buy else (tick < limit): break  # limit check
+            price = tick / TICKS_PER_UNIT
+            head, tail = level.head, len(level.orders)
+            if len(self._fills) < tail - head:
+                self._fills = np.empty(2 * (tail - head), dtype=np.int64)
+            left, done, touched = fill_level(level.remaining, head, tail, incoming.remaining, self._fills)
+            left = int(left)  # keep numpy scalars out of the qty maps
+            qty_map[tick] -= incoming.remaining - left
+            self._dirty = True
+            filled = level.orders[head:head + touched]
+            for resting, qty in zip(filled, self._fills[:touched].tolist()):
+                incoming.filled += qty
+                resting.filled += qty
+                trades.append((price, qty))
+                if resting.remaining == 0:
+                    self.orders.pop(resting.id, None)
+            # record this level's fills into the trade columns in one go
+            self._reserve_trades(touched)
+            n = self.trade_count
+            own, other = (self.trades_buy_id, self.trades_sell_id) if is_buy else (self.trades_sell_id, self.trades_buy_id)
+            own[n:n + touched] = incoming.id
+            other[n:n + touched] = [o.id for o in filled]
+            self.trades_price[n:n + touched] = price
+            self.trades_qty[n:n + touched] = self._fills[:touched]
+            self.trade_count = n + touched
+            level.pop_filled(done)
+            if not level:
+                del book[tick]
+                del qty_map[tick]
         # If incoming still has remaining and is a limit order, add rest to book
         if incoming.remaining > 0:
             # For buys we add remaining at incoming.price etc.
-            book = self.buys if incoming.side==Side.BUY else self.sells
-            prices = self.buy_prices if incoming.side==Side.BUY else self.sell_prices
-            if incoming.price not in book:
-                book[incoming.price] = deque()
-                self._add_level(prices, incoming.price, descending=(incoming.side==Side.BUY))
-            book[incoming.price].append(incoming)
-            self.orders[incoming.id] = incoming
+            self._add(incoming)
         return trades
 
     def aggregate_levels(self, depth=5):
         """Return aggregated (price, total_qty, num_orders) for bids and asks."""
         bids = []
         asks = []
-        for p in sorted(self.buy_prices, reverse=True)[:depth]:
-            total = sum(o.remaining for o in self.buys.get(p, []))
-            count = len(self.buys.get(p, []))
-            bids.append((p, total, count))
-        for p in sorted(self.sell_prices)[:depth]:
-            total = sum(o.remaining for o in self.sells.get(p, []))
-            count = len(self.sells.get(p, []))
-            asks.append((p, total, count))
+        for t, q in islice(reversed(self.buys.items()), depth):
+            bids.append((t / TICKS_PER_UNIT, self.buy_qty[t], len(q)))
+        for t, q in islice(self.sells.items(), depth):
+            asks.append((t / TICKS_PER_UNIT, self.sell_qty[t], len(q)))
         return bids, asks
 
     def best(self):
-        bid = max(self.buy_prices) if self.buy_prices else None
-        ask = min(self.sell_prices) if self.sell_prices else None
+        bid = self.buys.peekitem(-1)[0] / TICKS_PER_UNIT if self.buys else None
+        ask = self.sells.peekitem(0)[0] / TICKS_PER_UNIT if self.sells else None
         return bid, ask
 
 # ---- Pygame UI ----
 class OrderBookUI:
+    TEXT_CACHE_SIZE = 512
+    RANDOM_TABLE_SIZE = 4096  # power of two so the read index wraps with a mask
+    RANDOM_QTYS = (50, 100, 200, 300, 500, 1000)
+    ENGINE_HZ = 1000  # random orders per second submitted by the engine thread
+
     def __init__(self, book: OrderBook, width=900, height=600, depth=6):
         pygame.init()
         self.book = book
@@ -161,23 +224,79 @@ class OrderBookUI:
         self.font_med = pygame.font.SysFont("Arial", 16, bold=True)
         self.clock = pygame.time.Clock()
         self.random_flow = True
-        self.last_trades = []  # recent trades list of (price, qty)
+        self.last_trades = deque(maxlen=300)  # recent trades as (price, qty), oldest dropped first
         self.bg_color = (18,18,20)
         self.panel_color = (30,32,36)
         self.running = True
+        self._text_cache = OrderedDict()  # (text, font, color) -> rendered Surface, least recently used first
+        self._band_cache = {}  # (width, height, color) -> depth band Surface; widths are bounded by the column
+        # Manual order entry typed into the window: the side while "price qty" is being typed, None otherwise
+        self.input_mode = None
+        self.input_buffer = ""
+        self._static_bg = self._build_static_layer()
+        self._refill_random_orders()
+        # The engine thread mutates the book under this lock; the render loop takes it only
+        # to rebuild _last_snapshot (bids, asks, best, bids_total, asks_total, recent_trades) when the book is dirty
+        self._book_lock = threading.Lock()
+        self._last_snapshot = None
+
+    def _bar_rect(self):
+        return 20, 12, self.width - 40, 28  # x, y, w, h of the percentage bar
+
+    def _grid_layout(self):
+        margin_x, top_y, row_h = 20, 70, 44
+        col_w = (self.width - 2*margin_x) // 2 - 10
+        return margin_x, top_y, row_h, col_w
+
+    def _trades_panel_rect(self):
+        return 20, self.height - 200, 340, 120  # x, y, w, h
+
+    def _build_static_layer(self):
+        """Background, bar backdrop, depth-row panels and the trades panel box: drawn once, blitted every frame"""
+        layer = pygame.Surface((self.width, self.height)).convert()
+        layer.fill(self.bg_color)
+        x, y, bar_w, bar_h = self._bar_rect()
+        pygame.draw.rect(layer, (25,26,30), (x-2, y-2, bar_w+4, bar_h+4), border_radius=6)
+        margin_x, top_y, row_h, col_w = self._grid_layout()
+        for i in range(self.depth):
+            y = top_y + i*row_h
+            pygame.draw.rect(layer, self.panel_color, (margin_x, y, col_w, row_h-8), border_radius=6)
+            pygame.draw.rect(layer, self.panel_color, (self.width - margin_x - col_w, y, col_w, row_h-8), border_radius=6)
+        x, y, w, h = self._trades_panel_rect()
+        pygame.draw.rect(layer, (22,24,28), (x, y, w, h), border_radius=8)
+        layer.blit(self.font_med.render("Recent Trades", True, (230,230,0)), (x+8, y+6))
+        return layer
+
+    def _render(self, text, font, color):
+        """font.render with an LRU cache bounded at TEXT_CACHE_SIZE surfaces"""
+        key = (text, id(font), color)
+        surf = self._text_cache.get(key)
+        if surf is None:
+            surf = self._text_cache[key] = font.render(text, True, color)
+            if len(self._text_cache) > self.TEXT_CACHE_SIZE:
+                self._text_cache.popitem(last=False)
+        else:
+            self._text_cache.move_to_end(key)
+        return surf
+
+    def _band(self, w, h, color):
+        """Rounded depth band as a colorkeyed Surface, so bands can be blitted along with the row texts"""
+        key = (w, h, color)
+        surf = self._band_cache.get(key)
+        if surf is None:
+            surf = self._band_cache[key] = pygame.Surface((w, h)).convert()
+            surf.fill((0,0,0))
+            surf.set_colorkey((0,0,0))
+            pygame.draw.rect(surf, color, (0, 0, w, h), border_radius=4)
+        return surf
 
     def draw_percentage_bar(self, bids_total, asks_total):
         # top area: a horizontal bar showing bid vs ask ratio (left = bid green, right = ask red)
-        bar_w = self.width - 40
-        bar_h = 28
-        x = 20
-        y = 12
+        x, y, bar_w, bar_h = self._bar_rect()
         total = max(1, bids_total + asks_total)
         bid_frac = bids_total / total
         bid_w = int(bar_w * bid_frac)
         ask_w = bar_w - bid_w
-        # background panel
-        pygame.draw.rect(self.screen, (25,26,30), (x-2, y-2, bar_w+4, bar_h+4), border_radius=6)
         # draw bid segment
         pygame.draw.rect(self.screen, (24,160,80), (x, y, bid_w, bar_h), border_radius=6)
         # draw ask segment
@@ -186,28 +305,24 @@ class OrderBookUI:
         bid_pct = int(bid_frac*100)
         ask_pct = 100 - bid_pct
         txt = f"Bid {bid_pct}%    Ask {ask_pct}%"
-        surf = self.font_med.render(txt, True, (230,230,230))
+        surf = self._render(txt, self.font_med, (230,230,230))
         self.screen.blit(surf, (x + bar_w//2 - surf.get_width()//2, y + bar_h//2 - surf.get_height()//2))
 
-    def draw_grid(self, bids, asks):
-        # left column for bids, right column for asks
-        margin_x = 20
-        top_y = 70
-        row_h = 44
-        col_w = (self.width - 2*margin_x) // 2 - 10
+    def draw_grid(self, bids, asks, best):
+        # left column for bids, right column for asks; the row panels come from the static layer
+        margin_x, top_y, row_h, col_w = self._grid_layout()
         max_qty = 1
         for (_,q,_) in bids+asks:
             if q > max_qty: max_qty = q
 
         # header labels
-        self.screen.blit(self.font_med.render("Bid", True, (200,255,200)), (margin_x, top_y - 34))
-        self.screen.blit(self.font_med.render("Ask", True, (255,200,200)), (self.width - margin_x - 40, top_y - 34))
+        self.screen.blit(self._render("Bid", self.font_med, (200,255,200)), (margin_x, top_y - 34))
+        self.screen.blit(self._render("Ask", self.font_med, (255,200,200)), (self.width - margin_x - 40, top_y - 34))
 
+        # Rows never overlap each other, so every band goes first and every text after it in one blits call
+        bands, texts = [], []
         for i in range(self.depth):
             y = top_y + i*row_h
-            # background box for each side
-            pygame.draw.rect(self.screen, self.panel_color, (margin_x, y, col_w, row_h-8), border_radius=6)
-            pygame.draw.rect(self.screen, self.panel_color, (self.width - margin_x - col_w, y, col_w, row_h-8), border_radius=6)
 
             # draw bid row if present
             if i < len(bids):
@@ -215,32 +330,33 @@ class OrderBookUI:
                 # background intensity based on quantity proportion
                 ratio = min(1.0, q / max_qty)
                 band_w = int(ratio * (col_w - 24))
-                band_rect = (margin_x+8, y+8, band_w, row_h-24)
-                pygame.draw.rect(self.screen, (12,110,55), band_rect, border_radius=4)
+                if band_w > 0:
+                    bands.append((self._band(band_w, row_h-24, (12,110,55)), (margin_x+8, y+8)))
                 # texts
-                price_s = self.font_med.render(f"{p:.2f}", True, (230,230,230))
-                qty_s = self.font_med.render(f"{q}", True, (230,230,230))
-                cnt_s = self.font_small.render(f"{cnt}", True, (190,190,190))
-                self.screen.blit(price_s, (margin_x+12, y+8))
-                self.screen.blit(qty_s, (margin_x+col_w - qty_s.get_width() - 12, y+8))
-                self.screen.blit(cnt_s, (margin_x+col_w - qty_s.get_width() - 44, y+10))
+                price_s = self._render(f"{p:.2f}", self.font_med, (230,230,230))
+                qty_s = self._render(f"{q}", self.font_med, (230,230,230))
+                cnt_s = self._render(f"{cnt}", self.font_small, (190,190,190))
+                texts += [(price_s, (margin_x+12, y+8)),
+                          (qty_s, (margin_x+col_w - qty_s.get_width() - 12, y+8)),
+                          (cnt_s, (margin_x+col_w - qty_s.get_width() - 44, y+10))]
 
             # draw ask row if present
             if i < len(asks):
                 p, q, cnt = asks[i]
                 ratio = min(1.0, q / max_qty)
                 band_w = int(ratio * (col_w - 24))
-                band_rect = (self.width - margin_x - 8 - band_w, y+8, band_w, row_h-24)
-                pygame.draw.rect(self.screen, (150,30,30), band_rect, border_radius=4)
-                price_s = self.font_med.render(f"{p:.2f}", True, (230,230,230))
-                qty_s = self.font_med.render(f"{q}", True, (230,230,230))
-                cnt_s = self.font_small.render(f"{cnt}", True, (190,190,190))
-                self.screen.blit(price_s, (self.width - margin_x - col_w + 12, y+8))
-                self.screen.blit(qty_s, (self.width - margin_x - qty_s.get_width() - 12, y+8))
-                self.screen.blit(cnt_s, (self.width - margin_x - qty_s.get_width() - 44, y+10))
+                if band_w > 0:
+                    bands.append((self._band(band_w, row_h-24, (150,30,30)), (self.width - margin_x - 8 - band_w, y+8)))
+                price_s = self._render(f"{p:.2f}", self.font_med, (230,230,230))
+                qty_s = self._render(f"{q}", self.font_med, (230,230,230))
+                cnt_s = self._render(f"{cnt}", self.font_small, (190,190,190))
+                texts += [(price_s, (self.width - margin_x - col_w + 12, y+8)),
+                          (qty_s, (self.width - margin_x - qty_s.get_width() - 12, y+8)),
+                          (cnt_s, (self.width - margin_x - qty_s.get_width() - 44, y+10))]
+        self.screen.blits(bands + texts, doreturn=False)
 
         # draw mid spread box with best bid/ask
-        bid, ask = self.book.best()
+        bid, ask = best
         mid_x = self.width//2 - 60
         mid_y = top_y + self.depth*row_h//2 - 200
         #
@@ -250,94 +366,130 @@ class OrderBookUI:
         pygame.draw.rect(self.screen, (40,40,44), (mid_x, mid_y, 120, 48), border_radius=8)
         if bid is not None and ask is not None:
             spread = ask - bid
-            txt1 = self.font_small.render(f"Bid {bid:.2f}", True, (180,255,180))
-            txt2 = self.font_small.render(f"Ask {ask:.2f}", True, (255,200,200))
-            txt3 = self.font_small.render(f"Spread {spread:.2f}", True, (220,220,220))
+            txt1 = self._render(f"Bid {bid:.2f}", self.font_small, (180,255,180))
+            txt2 = self._render(f"Ask {ask:.2f}", self.font_small, (255,200,200))
+            txt3 = self._render(f"Spread {spread:.2f}", self.font_small, (220,220,220))
             self.screen.blit(txt1, (mid_x+8, mid_y+6))
             self.screen.blit(txt2, (mid_x+8, mid_y+24))
             self.screen.blit(txt3, (mid_x+8, mid_y+36))
 
-    def draw_trades_panel(self):
-        # small panel on bottom-left showing recent trades
-        x = 20
-        y = self.height - 200  # 140
-        w = 340
-        h = 120
-        pygame.draw.rect(self.screen, (22,24,28), (x, y, w, h), border_radius=8)
-        self.screen.blit(self.font_med.render("Recent Trades", True, (230,230,0)), (x+8, y+6))
-        for i, (price, qty) in enumerate(self.last_trades[-8:]):
-            t = self.font_small.render(f"{qty} @ {price:.2f}", True, (220,220,220))
+    def draw_trades_panel(self, recent):
+        # small panel on bottom-left showing recent trades; the box and its title come from the static layer
+        x, y, _, _ = self._trades_panel_rect()
+        for i, (price, qty) in enumerate(recent):
+            t = self._render(f"{qty} @ {price:.2f}", self.font_small, (220,220,220))
             self.screen.blit(t, (x+10, y+32 + i*14))
 
-    def step_random_order(self):
-        side = random.choice([Side.BUY, Side.SELL])
+    def draw_input_prompt(self):
+        if self.input_mode is None:
+            return
+        # Changes every keystroke, so it is rendered directly rather than through the text cache
+        txt = f"{self.input_mode.value} price qty: {self.input_buffer}_  (Enter to place, Esc to cancel)"
+        self.screen.blit(self.font_med.render(txt, True, (230,230,230)), (20, self.height - 60))
+
+    def handle_input_key(self, ev):
+        """Edit the manual order line; Enter places it, falling back to random defaults like the old console prompt"""
+        if ev.key == pygame.K_RETURN:
+            side, text = self.input_mode, self.input_buffer
+            self.input_mode, self.input_buffer = None, ""
+            try:
+                price_s, qty_s = text.split()
+                price, qty = float(price_s), int(qty_s)
+            except ValueError:
+                print("Invalid input, using random defaults.")
+                price = round(random.uniform(99.0,101.0),2)
+                qty = random.choice([100,200,500])
+            self.submit(Order(side=side, price=price, quantity=qty))
+        elif ev.key == pygame.K_ESCAPE:
+            self.input_mode, self.input_buffer = None, ""
+        elif ev.key == pygame.K_BACKSPACE:
+            self.input_buffer = self.input_buffer[:-1]
+        elif ev.unicode.isdigit() or ev.unicode in (".", " "):
+            self.input_buffer += ev.unicode
+
+    def _refill_random_orders(self):
+        """Draw the next batch of random order flow in one go"""
+        n = self.RANDOM_TABLE_SIZE
+        self._rand_sides = np.random.randint(0, 2, n).astype(np.int8)
         # price around center 100 with small ticks
-        price = round(random.uniform(99.0, 101.0), 2)
-        qty = random.choice([50,100,200,300,500,1000])
-        o = Order(side=side, price=price, quantity=qty)
-        trades = self.book.add_limit(o)
-        for tr in trades:
-            self.last_trades.append((tr.price, tr.qty))
-        if len(self.last_trades) > 300: self.last_trades = self.last_trades[-300:]
+        self._rand_prices = (99 + np.random.rand(n) * 2).round(2)
+        self._rand_qtys = np.random.choice(self.RANDOM_QTYS, n)
+        self._rand_idx = 0
+
+    def step_random_order(self):
+        i = self._rand_idx
+        side = Side.SELL if self._rand_sides[i] else Side.BUY
+        o = Order(side=side, price=float(self._rand_prices[i]), quantity=int(self._rand_qtys[i]))
+        self._rand_idx = (i + 1) & (self.RANDOM_TABLE_SIZE - 1)
+        if self._rand_idx == 0:
+            self._refill_random_orders()
+        self.submit(o)
+
+    def snapshot(self):
+        """Aggregated view of the book for drawing, recomputed only after the book has changed"""
+        if self.book._dirty or self._last_snapshot is None:
+            with self._book_lock:
+                self.book._dirty = False
+                bids, asks = self.book.aggregate_levels(depth=self.depth)
+                best = self.book.best()
+                recent = tuple(islice(reversed(self.last_trades), 8))[::-1]
+            bids_total = sum(q for (_,q,_) in bids)
+            asks_total = sum(q for (_,q,_) in asks)
+            self._last_snapshot = (bids, asks, best, bids_total, asks_total, recent)
+        return self._last_snapshot
+
+    def submit(self, order):
+        """Match order into the book; the book marks itself dirty for the next frame's snapshot"""
+        with self._book_lock:
+            self.last_trades.extend(self.book.add_limit(order))
+
+    def _engine_loop(self):
+        period = 1.0 / self.ENGINE_HZ
+        next_t = time.perf_counter()
+        while self.running:
+            if self.random_flow and self.input_mode is None:
+                self.step_random_order()
+            next_t += period
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_t = time.perf_counter()  # fell behind; don't burst to catch up
 
     def run(self):
-        tick = 0
+        engine = threading.Thread(target=self._engine_loop, daemon=True)
+        engine.start()
         while self.running:
             for ev in pygame.event.get():
                 if ev.type == pygame.QUIT:
                     self.running = False
+                elif ev.type == pygame.KEYDOWN and self.input_mode is not None:
+                    self.handle_input_key(ev)
                 elif ev.type == pygame.KEYDOWN:
                     if ev.key == pygame.K_ESCAPE:
                         self.running = False
                     elif ev.key == pygame.K_r:
                         self.random_flow = not self.random_flow
                     elif ev.key == pygame.K_b:
-                        # manual BUY
-                        try:
-                            price = float(input("BUY price: "))
-                            qty = int(input("BUY qty: "))
-                        except Exception as e:
-                            print("Invalid input, using random defaults.")
-                            price = round(random.uniform(99.0,101.0),2)
-                            qty = random.choice([100,200,500])
-                        o = Order(side=Side.BUY, price=price, quantity=qty)
-                        trades = self.book.add_limit(o)
-                        for tr in trades:
-                            self.last_trades.append((tr.price, tr.qty))
+                        self.input_mode, self.input_buffer = Side.BUY, ""
                     elif ev.key == pygame.K_s:
-                        # manual SELL
-                        try:
-                            price = float(input("SELL price: "))
-                            qty = int(input("SELL qty: "))
-                        except:
-                            print("Invalid input, using random defaults.")
-                            price = round(random.uniform(99.0,101.0),2)
-                            qty = random.choice([100,200,500])
-                        o = Order(side=Side.SELL, price=price, quantity=qty)
-                        trades = self.book.add_limit(o)
-                        for tr in trades:
-                            self.last_trades.append((tr.price, tr.qty))
-
-            if self.random_flow and (tick % 3 == 0):
-                # occasional random action
-                self.step_random_order()
+                        self.input_mode, self.input_buffer = Side.SELL, ""
 
-            # draw background
-            self.screen.fill((18,18,20))
-            # aggregate levels
-            bids, asks = self.book.aggregate_levels(depth=self.depth)
-            bids_total = sum(q for (_,q,_) in bids)
-            asks_total = sum(q for (_,q,_) in asks)
+            # draw background and static panels
+            self.screen.blit(self._static_bg, (0, 0))
+            # aggregated levels, reused while the book is unchanged
+            bids, asks, best, bids_total, asks_total, recent = self.snapshot()
             # draw percent bar
             self.draw_percentage_bar(bids_total, asks_total)
             # draw grid of levels
-            self.draw_grid(bids, asks)
+            self.draw_grid(bids, asks, best)
             # trades panel
-            self.draw_trades_panel()
+            self.draw_trades_panel(recent)
+            self.draw_input_prompt()
 
             pygame.display.flip()
             self.clock.tick(20)
-            tick += 1
+        engine.join()
         pygame.quit()
 
 if __name__=="__main__":
@@ -0,0 +1,25 @@
+"""
+Level-matching kernel for orderbook_full, kept free of pygame so build_kernels.py can compile it on its own.
+"""
+
+# Numba compiles the level-matching loop to native code; without it the loop runs as plain Python
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+@njit(cache=True)
+def match_levels(keys, qtys, fills, limit_key, qty):
+    """Fill qty against the ascending level keys, best first, while they are at or inside limit_key.
+    Takes each level's fill out of qtys and records it in fills; returns the unfilled qty and how many levels traded."""
+    i = 0
+    n = keys.shape[0]
+    while qty > 0 and i < n and keys[i] <= limit_key:
+        take = min(qty, qtys[i])
+        qtys[i] -= take
+        fills[i] = take
+        qty -= take
+        i += 1
+    return qty, i
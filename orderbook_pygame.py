@@ -13,7 +13,8 @@ from dataclasses import dataclass, field
 from enum import Enum
 import itertools
 from collections import deque
-import bisect
+from operator import neg
+from sortedcontainers import SortedDict
 
 _seq = itertools.count(1)
 def now_ts(): return next(_seq)
@@ -26,7 +27,7 @@ class OrderType(Enum):
     LIMIT = "LIMIT"
     MARKET = "MARKET"
 
-@dataclass(order=True)
+@dataclass(order=True, slots=True)
 class Order:
     sort_index: tuple = field(init=False, repr=False)
     id: int = field(default_factory=lambda: next(_seq))
@@ -51,7 +52,7 @@ class Order:
         self.filled += qty
         return qty
 
-@dataclass
+@dataclass(slots=True)
 class Trade:
     buy_order_id: int
     sell_order_id: int
@@ -59,47 +60,49 @@ class Trade:
     quantity: int
     timestamp: int = field(default_factory=now_ts)
 
+TICKS_PER_UNIT = 100  # prices are keyed in whole cents
+
+def to_tick(price):
+    return round(price * TICKS_PER_UNIT)
+
 class OrderBook:
     def __init__(self, symbol="TEST"):
         self.symbol = symbol
-        self.buys = {}
-        self.sells = {}
-        self.buy_prices = []
-        self.sell_prices = []
+        # price tick -> deque of orders, best price first: bids sort on -tick (descending), asks ascending
+        self.buys = SortedDict(neg)
+        self.sells = SortedDict()
+        # price tick -> total remaining qty at that level, updated on every add and fill
+        self.buy_qty = {}
+        self.sell_qty = {}
         self.orders = {}
         self.trades = []
 
     def _add(self, order: Order):
-        book = self.buys if order.side == Side.BUY else self.sells
-        prices = self.buy_prices if order.side == Side.BUY else self.sell_prices
-        if order.price not in book:
-            book[order.price] = deque()
-            bisect.insort(prices, order.price)
-        book[order.price].append(order)
+        book, qty_map = (self.buys, self.buy_qty) if order.side == Side.BUY else (self.sells, self.sell_qty)
+        tick = to_tick(order.price)
+        book.setdefault(tick, deque()).append(order)
+        qty_map[tick] = qty_map.get(tick, 0) + order.remaining
         self.orders[order.id] = order
 
-    def _best_sell_prices(self): return self.sell_prices
-    def _best_buy_prices(self): return sorted(self.buy_prices, reverse=True)
+    def _best_sell_prices(self): return self.sells.keys()
+    def _best_buy_prices(self): return self.buys.keys()
 
     def _match(self, incoming: Order):
         trades = []
-        opp_book = self.sells if incoming.side == Side.BUY else self.buys
-        opp_prices = self._best_sell_prices() if incoming.side == Side.BUY else self._best_buy_prices()
-
-        for price in list(opp_prices):
-            if incoming.remaining <= 0: break
-            if incoming.side == Side.BUY and price > incoming.price: break
-            if incoming.side == Side.SELL and price < incoming.price: break
-            q = opp_book[price]
-            i = 0
-            while i < len(q) and incoming.remaining > 0:
-                resting = q[i]
-                if resting.remaining <= 0: 
-                    i += 1
-                    continue
+        opp_book, opp_qty = (self.sells, self.sell_qty) if incoming.side == Side.BUY else (self.buys, self.buy_qty)
+
+        limit = to_tick(incoming.price)
+        while incoming.remaining > 0 and opp_book:
+            tick, q = opp_book.peekitem(0)
+            if incoming.side == Side.BUY and tick > limit: break
+            if incoming.side == Side.SELL and tick < limit: break
+            price = tick / TICKS_PER_UNIT
+            while q and incoming.remaining > 0:
+                resting = q[0]  # filled orders are popped straight away, so the head is always live
                 qty = min(incoming.remaining, resting.remaining)
                 incoming.fill(qty)
                 resting.fill(qty)
+                opp_qty[tick] -= qty
                 t = Trade(
                     buy_order_id=incoming.id if incoming.side==Side.BUY else resting.id,
                     sell_order_id=resting.id if incoming.side==Side.BUY else incoming.id,
@@ -107,14 +110,11 @@ class OrderBook:
                 trades.append(t)
                 self.trades.append(t)
                 if resting.remaining == 0:
-                    q.remove(resting)
+                    q.popleft()
                     self.orders.pop(resting.id, None)
-                else:
-                    i += 1
             if not q:
-                del opp_book[price]
-                if incoming.side == Side.BUY: self.sell_prices.remove(price)
-                else: self.buy_prices.remove(price)
+                del opp_book[tick]
+                del opp_qty[tick]
         return trades
 
     def submit(self, order: Order):
@@ -124,8 +124,8 @@ class OrderBook:
         return trades
 
     def snapshot(self, depth=10):
-        bids = [(p, sum(o.remaining for o in self.buys[p])) for p in self._best_buy_prices()[:depth]]
-        asks = [(p, sum(o.remaining for o in self.sells[p])) for p in self._best_sell_prices()[:depth]]
+        bids = [(t / TICKS_PER_UNIT, self.buy_qty[t]) for t in self._best_buy_prices()[:depth]]
+        asks = [(t / TICKS_PER_UNIT, self.sell_qty[t]) for t in self._best_sell_prices()[:depth]]
         return bids, asks
 
 # ---------------- Pygame Visualizer ----------------
@@ -140,7 +140,7 @@ class Visualizer:
         pygame.display.set_caption("Order Book Visualizer")
         self.clock = pygame.time.Clock()
         self.font = pygame.font.SysFont("Arial", 16)
-        self.last_trades = []
+        self.last_trades = deque(maxlen=300)
 
     def draw(self):
         self.screen.fill((0,0,0))
@@ -169,7 +169,7 @@ class Visualizer:
             self.screen.blit(self.font.render(f"{p:.2f} | {q}",True,(255,255,255)),(x+bar_w+5,y))
 
         # Draw last trades
-        for i,t in enumerate(self.last_trades[-5:]):
+        for i,t in enumerate(list(itertools.islice(reversed(self.last_trades), 5))[::-1]):
             txt = f"TRADE {t.quantity}@{t.price:.2f}"
             self.screen.blit(self.font.render(txt,True,(255,255,0)),(10,10+i*18))
 
@@ -1,7 +1,9 @@
 import pygame
-import math
+import numpy as np
 import sys
 
+from circle_stamp import circle_offsets
+
 # Initialize pygame
 pygame.init()
 
@@ -23,6 +25,16 @@ amplitude = HEIGHT // 4
 frequency = 0.02   # Horizontal spacing frequency
 speed = 0.1        # Phase shift per frame
 
+# Every point is stamped straight into the screen's pixel array as a radius-2 dot.
+# Per stamp offset: the x columns that stay on screen, and which points they belong to
+X = np.arange(WIDTH)
+STAMP = []
+for dx, dy in circle_offsets(2):
+    on_screen = (X + dx >= 0) & (X + dx < WIDTH)
+    STAMP.append(((X + dx)[on_screen], on_screen, dy))
+BLACK_PACKED = screen.map_rgb(BLACK)
+BLUE_PACKED = screen.map_rgb(BLUE)
+
 phase = 0
 
 running = True
@@ -31,12 +43,13 @@ while running:
         if event.type == pygame.QUIT:
             running = False
 
-    screen.fill(BLACK)
-
     # Draw sine wave as point cloud
-    for x in range(WIDTH):
-        y = HEIGHT // 2 + int(amplitude * math.sin(frequency * x + phase))
-        pygame.draw.circle(screen, BLUE, (x, y), 2)  # radius=2 for point effect
+    y = HEIGHT // 2 + (amplitude * np.sin(frequency * X + phase)).astype(np.int64)
+    pixels = pygame.surfarray.pixels2d(screen)
+    pixels.fill(BLACK_PACKED)
+    for xs, on_screen, dy in STAMP:
+        pixels[xs, y[on_screen] + dy] = BLUE_PACKED
+    del pixels  # unlock the screen before flipping
 
     # Update phase for animation
     phase += speed
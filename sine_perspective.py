@@ -1,7 +1,10 @@
 import pygame
 import math
+import numpy as np
 import sys
 
+from circle_stamp import circle_offsets
+
 pygame.init()
 
 # Screen setup
@@ -29,21 +32,39 @@ depth_start = 50
 depth_end = 1000
 points_count = 400
 
-# Camera rotation (around Y axis)
+# Camera rotation (around Y axis); the angle is fixed, so its cos/sin are computed once
 camera_angle = math.radians(45)
+COS_A, SIN_A = math.cos(camera_angle), math.sin(camera_angle)
 
-def rotate_y(x, z, angle):
-    """Rotate point around Y-axis"""
-    xr = x * math.cos(angle) - z * math.sin(angle)
-    zr = x * math.sin(angle) + z * math.cos(angle)
+def rotate_y(x, z):
+    """Rotate point arrays around Y-axis by the camera angle"""
+    xr = x * COS_A - z * SIN_A
+    zr = x * SIN_A + z * COS_A
     return xr, zr
 
 def project_point(x, y, z):
-    """Project 3D to 2D"""
+    """Project 3D point arrays to 2D pixel coordinates"""
     scale = 300 / (z + 1)
     px = WIDTH // 2 + x * scale
     py = vanish_y + y * scale
-    return int(px), int(py), scale
+    return px.astype(int), py.astype(int), scale
+
+# The ground grid never moves, so it is projected once
+GX, GZ = np.meshgrid(np.arange(-200, 201, 50), np.arange(depth_start, depth_end, 50))
+grid_rx, grid_rz = rotate_y(GX.ravel(), GZ.ravel())
+GRID_PX, GRID_PY, _ = project_point(grid_rx, 0, grid_rz)
+
+STAMP_MAX_RADIUS = 8  # larger dots are drawn with pygame.draw.circle rather than stamped
+
+# Black background with the ground grid, as a pixel array copied into the screen each frame
+screen.fill(BLACK)
+for point in zip(GRID_PX.tolist(), GRID_PY.tolist()):
+    pygame.draw.circle(screen, GRAY, point, 1)
+BACKGROUND = pygame.surfarray.array2d(screen)
+BLUE_PACKED = screen.map_rgb(BLUE)
+
+# Depth of each wave point along the line of sight
+Z = depth_start + (np.arange(points_count) / points_count) * (depth_end - depth_start)
 
 running = True
 while running:
@@ -51,32 +72,26 @@ while running:
         if event.type == pygame.QUIT:
             running = False
 
-    screen.fill(BLACK)
-
-    # Draw ground grid
-    for gz in range(depth_start, depth_end, 50):
-        for gx in range(-200, 201, 50):
-            rx, rz = rotate_y(gx, gz, camera_angle)
-            px, py, _ = project_point(rx, 0, rz)
-            pygame.draw.circle(screen, GRAY, (px, py), 1)
-
-    # Draw 3D sine wave points
-    for i in range(points_count):
-        z = depth_start + (i / points_count) * (depth_end - depth_start)
-
-        # Horizontal + vertical oscillation
-        x = math.sin(frequency * z + phase) * horizontal_amplitude
-        y = math.cos(frequency * z + phase) * vertical_amplitude
-
-        # Apply camera rotation
-        rx, rz = rotate_y(x, z, camera_angle)
-
-        # Project to 2D
-        px, py, scale = project_point(rx, y, rz)
-
-        # Draw point
-        size = max(1, int(3 * scale / 10))
-        pygame.draw.circle(screen, BLUE, (px, py), size)
+    # Draw 3D sine wave points: horizontal + vertical oscillation, camera rotation, projection
+    x = np.sin(frequency * Z + phase) * horizontal_amplitude
+    y = np.cos(frequency * Z + phase) * vertical_amplitude
+    rx, rz = rotate_y(x, Z)
+    px, py, scale = project_point(rx, y, rz)
+    sizes = np.maximum(1, (3 * scale / 10).astype(int))
+
+    # Stamp every point's dot straight into the screen's pixels, over the pre-drawn grid
+    pixels = pygame.surfarray.pixels2d(screen)
+    pixels[...] = BACKGROUND
+    for size in np.unique(sizes[sizes <= STAMP_MAX_RADIUS]).tolist():
+        same_size = sizes == size
+        for dx, dy in circle_offsets(size):
+            xs, ys = px[same_size] + dx, py[same_size] + dy
+            on_screen = (xs >= 0) & (xs < WIDTH) & (ys >= 0) & (ys < HEIGHT)
+            pixels[xs[on_screen], ys[on_screen]] = BLUE_PACKED
+    del pixels  # unlock the screen before drawing and flipping
+    # Points almost level with the camera blow up to huge dots; those few are left to draw.circle
+    for i in np.flatnonzero(sizes > STAMP_MAX_RADIUS).tolist():
+        pygame.draw.circle(screen, BLUE, (int(px[i]), int(py[i])), int(sizes[i]))
 
     phase += speed
     pygame.display.flip()
@@ -1,44 +1,47 @@
 import random
 import time
 
-def print_board(board):
-    for row in board:
+# Each player's marks are a 9-bit int: bit 3*row + col is set when they hold that cell
+FULL = 0x1FF
+WINLINES = (0b000000111, 0b000111000, 0b111000000,  # rows
+            0b001001001, 0b010010010, 0b100100100,  # columns
+            0b100010001, 0b001010100)               # diagonals
+# WIN_LUT[bits] is True when bits covers any winline
+WIN_LUT = [any(bits & m == m for m in WINLINES) for bits in range(FULL + 1)]
+
+def print_board(board_x, board_o):
+    for i in range(3):
+        row = []
+        for j in range(3):
+            bit = 1 << (3 * i + j)
+            row.append('X' if board_x & bit else 'O' if board_o & bit else ' ')
         print(" | ".join(row))
         print("-" * 9)
 
-def check_winner(board, player):
-    # Check rows, columns and diagonals
-    for i in range(3):
-        if all([cell == player for cell in board[i]]):
-            return True
-        if all([board[j][i] == player for j in range(3)]):
-            return True
-    if all([board[i][i] == player for i in range(3)]):
-        return True
-    if all([board[i][2 - i] == player for i in range(3)]):
-        return True
-    return False
+def check_winner(bits):
+    return WIN_LUT[bits]
 
-def get_empty_cells(board):
-    return [(i, j) for i in range(3) for j in range(3) if board[i][j] == ' ']
+def get_empty_cells(board_x, board_o):
+    empty = ~(board_x | board_o) & FULL
+    return [divmod(k, 3) for k in range(9) if empty >> k & 1]
 
 def play_game():
-    board = [[' ' for _ in range(3)] for _ in range(3)]
+    boards = {'X': 0, 'O': 0}
     players = ['X', 'O']
     turn = 0
     print("Initial board:")
-    print_board(board)
+    print_board(boards['X'], boards['O'])
     while True:
         player = players[turn % 2]
-        empty = get_empty_cells(board)
+        empty = get_empty_cells(boards['X'], boards['O'])
         if not empty:
             print("It's a draw!")
             break
         move = random.choice(empty)
-        board[move[0]][move[1]] = player
+        boards[player] |= 1 << (3 * move[0] + move[1])
         print(f"\nPlayer {player} moves to {move}")
-        print_board(board)
-        if check_winner(board, player):
+        print_board(boards['X'], boards['O'])
+        if check_winner(boards[player]):
             print(f"Player {player} wins!")
             break
         turn += 1